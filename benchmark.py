@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+
+"""
+benchmark for dissector *** times every stage on synthetic 6502 images
+usage: benchmark.py [-h] [-lf LABEL_FILE] [-r REPEAT] [-j JSON_FILE] [-c COMPARE_FILE]
+
+Example: ./benchmark.py -r 5 -j bench.json -c bench_old.json
+"""
+
+import sys
+import os
+import json
+import random
+import tempfile
+import time
+import platform
+import argparse
+import dissector as dis
+
+
+
+SEED = 6502
+
+#opcodes of normal (non-illegal) instructions
+LEGAL_OPCODES = tuple(
+    my_value for my_value in range(256)
+    if (dis.OPCODE[dis.CODE[my_value][0]]['type'] != 4)
+)
+
+#legal opcodes with a 16 bit address, branches excluded
+ABSOLUTE_OPCODES = tuple(
+    my_value for my_value in LEGAL_OPCODES
+    if (dis.CODE[my_value][1] in (7, 8, 9))
+)
+
+
+
+
+def _create_random_image (
+    size
+) :
+    rand = random.Random(SEED)
+    return bytes(rand.getrandbits(8) for _ in range(size))
+
+
+
+def _create_code_image (
+    size
+) :
+    # dense stream of legal instructions with random operands
+    rand = random.Random(SEED+1)
+    image = bytearray()
+    while (len(image) < size) :
+        my_value = rand.choice(LEGAL_OPCODES)
+        image.append(my_value)
+        for _ in range(dis.MODE[dis.CODE[my_value][1]]['length']-1) : image.append(rand.getrandbits(8))
+    return bytes(image[:size])
+
+
+
+def _create_snapshot_image () :
+    # 64K memory snapshot: code blocks, tables and empty memory
+    rand = random.Random(SEED+2)
+    code = _create_code_image(0x10000)
+    noise = _create_random_image(0x10000)
+    image = bytearray(0x10000)
+    for block in range(0, 0x10000, 0x400) :
+        kind = rand.randrange(4)
+        if (kind == 0) : image[block:block+0x400] = code[block:block+0x400]
+        if (kind == 1) : image[block:block+0x400] = noise[block:block+0x400]
+        if (kind == 2) : image[block:block+0x400] = bytes([rand.getrandbits(8)]) * 0x400
+    return bytes(image)
+
+
+
+def _create_label_image (
+    size,
+    label_db
+) :
+    # absolute instructions addressing the ranges of the label-file
+    rand = random.Random(SEED+3)
+    targets = [this_def['from'] for this_def in label_db['labels'] if (this_def['from'] <= 0xffff)]
+    image = bytearray()
+    while (len(image) < size) :
+        target = rand.choice(targets)
+        image.append(rand.choice(ABSOLUTE_OPCODES))
+        image.append(target & 0xff)
+        image.append(target >> 8)
+    return bytes(image[:size])
+
+
+
+def _time_stage (
+    repeat,
+    function,
+    *arguments
+) :
+    # best of repeat runs, returns (seconds, result of the last run)
+    best = None
+    for _ in range(repeat) :
+        time_start = time.perf_counter()
+        result = function(*arguments)
+        seconds = time.perf_counter()-time_start
+        if ((best is None) or (seconds < best)) : best = seconds
+    return best, result
+
+
+
+def _benchmark_image (
+    name,
+    image,
+    my_address,
+    label_db,
+    repeat,
+    directory
+) :
+    filename_in = os.path.join(directory, name+'.bin')
+    filename_out = os.path.join(directory, name+'.a')
+    with open(filename_in, 'wb') as file_in : file_in.write(image)
+
+    stages = {}
+    stages['_read_file'], buffer = _time_stage(repeat, dis._read_file, filename_in, 0, 0, dis._no_log)
+    stages['_create_disassembly'], disassembly = _time_stage(repeat, dis._create_disassembly, buffer, my_address)
+    instruction_starts = dis._create_instruction_starts(disassembly)
+    stages['_create_labels'], labels = _time_stage(
+        repeat,
+        dis._create_labels,
+        disassembly, instruction_starts, label_db, my_address, len(buffer), dis._no_log
+    )
+    label_index = dis._create_label_index(labels)
+
+    def write_disassembly() :
+        file_out = dis._open_output_file(filename_out, dis._no_log)
+        dis._write_disassembly(file_out, disassembly, my_address, 'acme', True, False, label_index)
+        return file_out
+
+    stages['_write_disassembly'], file_out = _time_stage(1, write_disassembly)
+    stages['_save_file'], _ = _time_stage(1, dis._save_file, file_out)
+    for _ in range(repeat-1) :
+        seconds, file_out = _time_stage(1, write_disassembly)
+        stages['_write_disassembly'] = min(stages['_write_disassembly'], seconds)
+        seconds, _ = _time_stage(1, dis._save_file, file_out)
+        stages['_save_file'] = min(stages['_save_file'], seconds)
+
+    total = 0.0
+    for seconds in stages.values() : total += seconds
+
+    report = {
+        'bytes' : len(image),
+        'instructions' : len(disassembly),
+        'labels' : len(labels),
+        'output_bytes' : os.path.getsize(filename_out),
+        'stages' : {},
+        'total' : {
+            'seconds' : total,
+            'bytes_per_second' : len(image)/total,
+            'instructions_per_second' : len(disassembly)/total
+        }
+    }
+    for stage, seconds in stages.items() :
+        report['stages'][stage] = {
+            'seconds' : seconds,
+            'bytes_per_second' : len(image)/seconds if (seconds > 0) else None,
+            'instructions_per_second' : len(disassembly)/seconds if (seconds > 0) else None
+        }
+    return report
+
+
+
+def _print_report (
+    name,
+    report,
+    previous
+) :
+    print('%s: %d bytes, %d instructions, %d labels' % (name, report['bytes'], report['instructions'], report['labels']))
+    rows = list(report['stages'].items()) + [('total', report['total'])]
+    for stage, data in rows :
+        line = '    %-20s %9.3f ms %12.0f bytes/s %12.0f instructions/s' % (
+            stage,
+            data['seconds']*1000,
+            data['bytes_per_second'] or 0,
+            data['instructions_per_second'] or 0
+        )
+        if (previous is not None) :
+            if (stage == 'total') : old = previous['total']
+            else : old = previous['stages'].get(stage)
+            if ((old is not None) and (data['seconds'] > 0)) :
+                line += '   %+6.1f%%' % ((data['seconds']/old['seconds']-1)*100)
+        print(line)
+    return None
+
+
+
+def _main_procedure() :
+    print("benchmark for %s v%s [%s]"% (dis.PROGNAME, dis.VERSION, dis.DATUM))
+
+    parser = argparse.ArgumentParser(
+        description='This program times every stage of dissector on synthetic 6502 images.',
+        epilog='Example: ./benchmark.py -r 5 -j bench.json -c bench_old.json'
+    )
+    parser.add_argument('-lf', '--label-file', dest='label_file', help='labels json-file, default=\"c64labels.json\"', default='c64labels.json')
+    parser.add_argument('-r', '--repeat', dest='repeat', help='runs per stage, the best one counts, default=3', type=int, default=3)
+    parser.add_argument('-j', '--json', dest='json_file', help='write the results to this json-file')
+    parser.add_argument('-c', '--compare', dest='compare_file', help='compare with the results in this json-file')
+    args = parser.parse_args()
+
+    try:
+        label_db = dis._read_label_file(args.label_file, False, dis._no_log)
+    except dis.DissectorError as err:
+        print(err)
+        sys.exit(1)
+
+    previous = {}
+    if (args.compare_file is not None) :
+        try:
+            with open(args.compare_file, 'r') as file_compare :
+                previous = json.load(file_compare)['images']
+        except (IOError, ValueError, KeyError) as err:
+            print("error: compare-file {0}".format(err))
+            sys.exit(1)
+
+    images = (
+        ('random_16k', _create_random_image(0x4000), 0xc000),
+        ('code_16k', _create_code_image(0x4000), 0x0801),
+        ('snapshot_64k', _create_snapshot_image(), 0x0000),
+        ('labels_16k', _create_label_image(0x4000, label_db), 0x1000)
+    )
+
+    results = {
+        'version' : dis.VERSION,
+        'python' : platform.python_version(),
+        'numpy' : dis._import_numpy() is not None,
+        'repeat' : args.repeat,
+        'images' : {}
+    }
+    with tempfile.TemporaryDirectory() as directory :
+        for name, image, my_address in images :
+            report = _benchmark_image(name, image, my_address, label_db, args.repeat, directory)
+            results['images'][name] = report
+            _print_report(name, report, previous.get(name))
+
+    if (args.json_file is not None) :
+        try:
+            with open(args.json_file, 'w') as file_json :
+                json.dump(results, file_json, indent=2)
+        except IOError as err:
+            print("I/O error: {0}".format(err))
+            sys.exit(1)
+
+    return None
+
+
+if __name__ == '__main__':
+    _main_procedure()
@@ -0,0 +1,4063 @@
+#!/usr/bin/env python3
+
+"""
+dissector v1.01 [17.10.2021] *** by fieserWolF
+usage: dissector.py [-h] [-lf LABEL_FILE] [-o OFFSET] [-l LIMIT] [-t {64tass,acme,ca65,kickass}] [-d] [--dump-chars {petscii,screen}] [-i] [-ll] [-cc] [-x] [-f] [-e ENTRIES] [--trace TRACE] [--jsonl JSONL_FILE] [--columns COLUMNS_FILE] [--rebuild-label-cache] [-s SESSION] [--no-cache] [--cache-size CACHE_SIZE] [--stats] [--stats-memory] [--stats-json STATS_JSON] [--profile PROFILE] [--serve SERVE] [-b BATCH] [-j JOBS] [--summary SUMMARY] [input_file] [output_file] [startaddress]
+
+This program disassembles 6502 code.
+
+positional arguments:
+  input_file            binary input file, "-" reads from stdin
+  output_file           sourcecode output file, "-" writes to stdout
+  startaddress          startaddress in hex, read from the file for .prg, .d64, .t64 and .crt if missing
+
+optional arguments:
+  -h, --help            show this help message and exit
+  -lf LABEL_FILE, --label-file LABEL_FILE
+                        labels json-file, default="c64labels.json"
+  -o OFFSET, --offset OFFSET
+                        offset in hex
+  -l LIMIT, --limit LIMIT
+                        limit in hex
+  -t {64tass,acme,ca65,kickass}, --asmtype {64tass,acme,ca65,kickass}
+                        assembler-type
+  -d, --dump            show memory-dump
+  --dump-chars {petscii,screen}
+                        show the memory-dump as characters, too
+  -i, --illegals        use illegal opcodes
+  -ll, --labels         show label-list
+  -cc, --cycles         show cycles
+  -x, --xref            show cross-references
+  -f, --flow            follow the program flow, unreached bytes are data
+  -e ENTRIES, --entry ENTRIES
+                        additional entry point in hex for --flow, can be repeated
+  --trace TRACE         run the program for this many cycles (decimal) and follow the executed code like --flow
+  --jsonl JSONL_FILE    also write the instructions as json lines to this file, "-" writes to stdout
+  --columns COLUMNS_FILE
+                        also write the instruction table as binary columns to this file
+  --rebuild-label-cache
+                        recompile the cached labels json-file
+  -s SESSION, --session SESSION
+                        session file, only stages whose input changed are run again
+  --no-cache            do not use or update the result cache
+  --cache-size CACHE_SIZE
+                        megabytes kept in the result cache, default=256
+  --stats               show the time of every stage and counters on stderr
+  --stats-memory        like --stats, but also trace the peak memory of every stage, which slows them down
+  --stats-json STATS_JSON
+                        write the statistics to this json-file
+  --profile PROFILE     write cProfile data of the whole run to this file
+  --serve SERVE         serve json requests on this unix socket path or loopback host:port
+  -b BATCH, --batch BATCH
+                        disassemble all files listed in this manifest json-file
+  -j JOBS, --jobs JOBS  number of worker processes in batch mode (default=number of cpus) or for decoding and labelling one large image (default=1)
+  --summary SUMMARY     write a json summary of the batch or image run to this file
+
+Example: ./dissector.py test.prg test.a 2000 -lf c64labels.json -o 2 -l 100 -t acme --dump --labels --illegals --cycles
+"""
+
+import sys
+import os
+import mmap
+import array
+import hashlib
+import pickle
+import io
+import threading
+import contextlib
+import struct
+import functools
+import time
+import json
+import argparse
+#concurrent.futures, tracemalloc, cProfile, shutil, glob, base64, asyncio and numpy are
+#imported by the functions using them, most runs need none of them and start faster
+
+
+
+PROGNAME = 'dissector';
+VERSION = '1.01';
+DATUM = '17.10.2021';
+
+MAX_LABEL_TYPES = 20
+MAX_AREA_TYPE = 8   #has to match area_type in .json file
+DEFAULT_OPTIONS = {
+    'offset' : 0,
+    'limit' : 0,
+    'label_file' : 'c64labels.json',
+    'label_db' : None,  #compiled label database, read from label_file if None
+    'rebuild_label_cache' : False,
+    'asmtype' : 'acme',
+    'memorydump' : False,
+    'dumpchars' : None, #'petscii' or 'screen': show the bytes of the memory-dump as characters, too
+    'illegals' : False,
+    'labellist' : False,
+    'cycles' : False,
+    'xref' : False,     #write cross-references at label definitions and as list
+    'flow' : False,     #follow the program flow instead of a linear sweep
+    'entries' : (),     #additional entry points for the flow-following disassembly
+    'trace' : 0,        #cycles the program is run for, executed code is followed like with flow
+    'cache' : True,     #reuse results of identical earlier runs
+    'jobs' : 1,         #worker processes decoding and labelling large images in chunks
+    'cache_size' : 0x10000000,  #bytes kept in the result cache
+    'filename' : None,  #shown in the header, defaults to the input filename
+    'session' : None,   #session file keeping decoded instructions and labels between runs
+    'stats' : None,     #dict, filled with time per stage and counters
+    'stats_memory' : False, #also trace the peak memory per stage into stats, slows down every stage
+    'progress' : None,  #function called with the name of every stage before it runs, may raise DissectorCancelled
+    'cancel' : None,    #object with is_set() like threading.Event, polled while writing, raises DissectorCancelled
+    'log' : None        #function called with progress messages
+}
+
+SERVER_LINE_LIMIT = 0x1000000    #longest request line accepted by --serve
+SERVER_TRACE_LIMIT = 5000000    #cycles a --serve request may trace, summed over all starts
+SERVER_OPTIONS = (  #options a --serve client may set
+    'offset', 'limit', 'asmtype', 'memorydump', 'dumpchars', 'illegals', 'labellist',
+    'cycles', 'xref', 'flow', 'entries', 'trace', 'cache'
+)
+
+BATCH_UNSUPPORTED_ARGUMENTS = (    #(dest, flag) of the arguments rejected with --batch
+    ('entries', '-e/--entry'), ('session', '-s/--session'), ('stats', '--stats'),
+    ('stats_memory', '--stats-memory'), ('stats_json', '--stats-json'), ('profile', '--profile'),
+    ('jsonl_file', '--jsonl'), ('columns_file', '--columns')
+)
+CONTAINER_UNSUPPORTED_ARGUMENTS = (    #(dest, flag) of the arguments rejected for disk, tape and cartridge images
+    ('session', '-s/--session'), ('stats', '--stats'), ('stats_memory', '--stats-memory'),
+    ('stats_json', '--stats-json'), ('profile', '--profile'), ('jsonl_file', '--jsonl'),
+    ('columns_file', '--columns')
+)
+
+D64_SIZE = 174848    #35 tracks, larger images have 40 tracks and/or error bytes
+D64_SIZE_40 = 196608
+T64_SIGNATURE = b'C64'
+CRT_SIGNATURE = b'C64 CARTRIDGE   '
+
+SESSION_VERSION = 1    #increase when the session file changes
+RESULT_CACHE_VERSION = 1   #increase when the cached results change
+RESULT_CACHE_STALE_SECONDS = 3600  #temporary result cache files this old are left over from killed runs
+LABEL_CACHE_VERSION = 1    #increase when the compiled label database changes
+MMAP_THRESHOLD = 0x10000    #input files at least this large are memory-mapped
+OUTPUT_BUFFER_SIZE = 0x10000   #bytes buffered before output is written
+NUMPY_THRESHOLD = 0x8000    #buffers at least this large are decoded with numpy, if available; below, importing numpy costs more than it saves
+PARALLEL_THRESHOLD = 0x8000 #buffers at least this large are split into chunks if jobs > 1
+CANCEL_CHECK_INTERVAL = 0x400  #instructions written between two checks of the cancel option
+TRACE_LINE_CYCLES = 63      #PAL raster line
+TRACE_LINES = 312
+TRACE_FRAME_CYCLES = TRACE_LINE_CYCLES*TRACE_LINES
+KERNAL_IRQ_EXITS = (0xea31, 0xea7e, 0xea81, 0xfebc) #jumps here end an interrupt handler
+
+ASSEMBLERS = {}  #assembler back-ends by name, filled by register_assembler()
+
+
+#http://www.oxyron.de/html/opcodes02.html
+
+MODE = (    #string (not really necessary), length, label_possible
+    {'name':'none', 'length': 1, 'label_possible': False},                    #0
+    {'name':'imm = #$00', 'length': 2, 'label_possible': False},              #1
+    {'name':'zp = $00', 'length': 2, 'label_possible': True},                 #2
+    {'name':'zpx = $00,X', 'length': 2, 'label_possible': True},              #3
+    {'name':'zpy = $00,Y', 'length': 2, 'label_possible': True},              #4
+    {'name':'izx = ($00,X)', 'length': 2, 'label_possible': True},            #5
+    {'name':'izy = ($00),Y', 'length': 2, 'label_possible': True},            #6
+    {'name':'abs = $0000', 'length': 3, 'label_possible': True},              #7
+    {'name':'abx = $0000,X', 'length': 3, 'label_possible': True},            #8
+    {'name':'aby = $0000,Y', 'length': 3, 'label_possible': True},            #9
+    {'name':'ind = ($0000}', 'length': 3, 'label_possible': True},            #10
+    {'name':'rel = $0000 (PC-relative}', 'length': 3, 'label_possible': True} #11
+)
+
+
+OPCODE = (
+    #types:
+    #0 = normal opcode
+    #1 = jsr
+    #2 = jump
+    #3 = brk/rts/rti
+    #4 = illegal opcode
+    #5 = branch
+    #6 = load
+    #7 = store
+    #8 = data (only used for bytes not reached by the flow-following disassembly)
+    {'name':'adc', 'type':6},    #0
+    {'name':'and', 'type':6},    #1
+    {'name':'asl', 'type':7},    #2
+    {'name':'bcc', 'type':5},    #3
+    {'name':'bcs', 'type':5},    #4
+    {'name':'beq', 'type':5},    #5
+    {'name':'bit', 'type':6},    #6
+    {'name':'bmi', 'type':5},    #7
+    {'name':'bne', 'type':5},    #8
+    {'name':'bpl', 'type':5},    #9
+    {'name':'brk', 'type':3},    #10
+    {'name':'bvc', 'type':5},    #11
+    {'name':'bvs', 'type':5},    #12
+    {'name':'clc', 'type':0},    #13
+    {'name':'cld', 'type':0},    #14
+    {'name':'cli', 'type':0},    #15
+    {'name':'clv', 'type':0},    #16
+    {'name':'cmp', 'type':6},    #17
+    {'name':'cpx', 'type':6},    #18
+    {'name':'cpy', 'type':6},    #19
+    {'name':'dec', 'type':7},    #20
+    {'name':'dex', 'type':7},    #21
+    {'name':'dey', 'type':7},    #22
+    {'name':'eor', 'type':6},    #23
+    {'name':'inc', 'type':7},    #24
+    {'name':'inx', 'type':7},    #25
+    {'name':'iny', 'type':7},    #26
+    {'name':'jmp', 'type':2},    #27
+    {'name':'jsr', 'type':1},    #28
+    {'name':'lda', 'type':6},    #29
+    {'name':'ldx', 'type':6},    #30
+    {'name':'ldy', 'type':6},    #31
+    {'name':'lsr', 'type':7},    #32
+    {'name':'nop', 'type':0},    #33
+    {'name':'ora', 'type':6},    #34
+    {'name':'pha', 'type':0},    #35
+    {'name':'php', 'type':0},    #36
+    {'name':'pla', 'type':0},    #37
+    {'name':'plp', 'type':0},    #38
+    {'name':'rol', 'type':7},    #39
+    {'name':'ror', 'type':7},    #40
+    {'name':'rti', 'type':3},    #41
+    {'name':'rts', 'type':3},    #42
+    {'name':'sbc', 'type':6},    #43
+    {'name':'sec', 'type':0},    #44
+    {'name':'sed', 'type':0},    #45
+    {'name':'sei', 'type':0},    #46
+    {'name':'sta', 'type':7},    #47
+    {'name':'stx', 'type':7},    #48
+    {'name':'sty', 'type':7},    #49
+    {'name':'tax', 'type':0},    #50
+    {'name':'tay', 'type':0},    #51
+    {'name':'tsx', 'type':0},    #52
+    {'name':'txa', 'type':0},    #53
+    {'name':'txs', 'type':0},    #54
+    {'name':'tya', 'type':0},    #55
+    {'name':'slo', 'type':4},    #56
+    {'name':'rla', 'type':4},    #57
+    {'name':'sre', 'type':4},    #58
+    {'name':'rra', 'type':4},    #59
+    {'name':'sax', 'type':4},    #60
+    {'name':'lax', 'type':4},    #61
+    {'name':'dcp', 'type':4},    #62
+    {'name':'isc', 'type':4},    #63
+    {'name':'kil', 'type':4},    #64
+    {'name':'anc', 'type':4},    #65
+    {'name':'alr', 'type':4},    #66
+    {'name':'arr', 'type':4},    #67
+    {'name':'xaa', 'type':4},    #68
+    {'name':'axs', 'type':4},    #69
+    {'name':'sbc', 'type':4},    #70
+    {'name':'ahx', 'type':4},    #71
+    {'name':'shy', 'type':4},    #72
+    {'name':'shx', 'type':4},    #73
+    {'name':'tas', 'type':4},    #74
+    {'name':'las', 'type':4}     #75
+)
+
+
+CODE = (    # OPCODE, MODE, CYCLE, CYCLE_ADD_IF_BOUNDARY_CROSSED
+    (10,0,7,0), #$00
+    (34,5,6,0), #$01
+    (64,0,0,0), #$02
+    (56,5,8,0), #$03
+    (33,2,3,0), #$04
+    (34,2,3,0), #$05
+    (2,2,5,0),  #$06
+    (56,2,5,0), #$07
+    (36,0,3,0), #$08
+    (34,1,2,0), #$09
+    (2,0,2,0),  #$0a
+    (65,1,2,0), #$0b
+    (33,7,4,0), #$0c
+    (34,7,4,0), #$0d
+    (2,7,6,0),  #$0e
+    (56,7,6,0), #$0f
+    (9,11,2,1), #$10    ###
+    (34,6,5,1), #$11
+    (64,0,0,0), #$12
+    (56,6,8,0), #$13
+    (33,3,4,0), #$14
+    (34,3,4,0), #$15
+    (2,3,6,0),  #$16
+    (56,3,6,0), #$17
+    (13,0,2,0), #$18
+    (34,9,4,1), #$19
+    (33,0,2,0), #$1a
+    (56,9,7,0), #$1b
+    (33,8,4,1), #$1c
+    (34,8,4,1), #$1d
+    (2,8,7,0),  #$1e
+    (56,8,7,0), #$1f
+    (28,7,6,0), #$20    ###
+    (1,5,6,0),  #$21
+    (64,0,0,0), #$22
+    (57,5,8,0), #$23
+    (6,2,3,0),  #$24
+    (1,2,3,0),  #$25
+    (39,2,5,0), #$26
+    (57,2,5,0), #$27
+    (38,0,4,0), #$28
+    (1,1,2,0),  #$29
+    (39,0,2,0), #$2a
+    (65,1,2,0), #$2b
+    (6,7,4,0),  #$2c
+    (1,7,4,0),  #$2d
+    (39,7,6,0), #$2e
+    (57,7,6,0), #$2f
+    (7,11,2,1), #$30    ###
+    (1,6,5,1),  #$31
+    (64,0,0,0), #$32
+    (57,6,8,0), #$33
+    (33,3,4,0), #$34
+    (1,3,4,0),  #$35
+    (39,3,6,0), #$36
+    (57,3,6,0), #$37
+    (44,0,2,0), #$38
+    (1,9,4,1),  #$39
+    (33,0,2,0), #$3a
+    (57,9,7,0), #$3b
+    (33,8,4,1), #$3c
+    (1,8,4,1),  #$3d
+    (39,8,7,0), #$3e
+    (57,8,7,0), #$3f
+    (41,0,6,0), #$40    ###
+    (23,5,6,0), #$41
+    (64,0,0,0), #$42
+    (58,5,8,0), #$43
+    (33,2,3,0), #$44
+    (23,2,3,0), #$45
+    (32,2,5,0), #$46
+    (58,2,5,0), #$47
+    (35,0,3,0), #$48
+    (23,1,2,0), #$49
+    (32,0,2,0), #$4a
+    (66,1,2,0), #$4b
+    (27,7,3,0), #$4c
+    (23,7,4,0), #$4d
+    (32,7,6,0), #$4e
+    (58,7,6,0), #$4f
+    (11,11,2,1), #$50   ###
+    (23,6,5,1), #$51
+    (64,0,0,0), #$52
+    (58,6,8,0), #$53
+    (33,3,4,0), #$54
+    (23,3,4,0), #$55
+    (32,3,6,0), #$56
+    (58,3,6,0), #$57
+    (15,0,2,0), #$58
+    (23,9,4,1), #$59
+    (33,0,2,0), #$5a
+    (58,9,7,0), #$5b
+    (33,8,4,1), #$5c
+    (23,8,4,1), #$5d
+    (32,8,7,0), #$5e
+    (58,8,7,0), #$5f
+    (42,0,6,0), #$60    ###
+    (0,5,6,0),  #$61
+    (64,0,0,0), #$62
+    (59,5,8,0), #$63
+    (33,2,3,0), #$64
+    (0,2,3,0),  #$65
+    (40,2,5,0), #$66
+    (59,2,5,0), #$67
+    (37,0,4,0), #$68
+    (0,1,2,0),  #$69
+    (40,0,2,0), #$6a
+    (67,1,2,0), #$6b
+    (27,10,5,0), #$6c
+    (0,7,4,0),  #$6d
+    (40,7,6,0), #$6e
+    (59,7,6,0), #$6f
+    (12,11,2,1), #$70   ###
+    (0,6,5,1),  #$71
+    (64,0,0,0), #$72
+    (59,6,8,0), #$73
+    (33,3,4,0), #$74
+    (0,3,4,0),  #$75
+    (40,3,6,0), #$76
+    (59,3,6,0), #$77
+    (46,0,2,0), #$78
+    (0,9,4,1),  #$79
+    (33,0,2,0), #$7a
+    (59,9,7,0), #$7b
+    (33,8,4,1), #$7c
+    (0,8,4,1),  #$7d
+    (40,8,7,0), #$7e
+    (59,8,7,0), #$7f
+    (33,1,2,0), #$80    ###
+    (47,5,6,0), #$81
+    (33,1,2,0), #$82
+    (60,5,6,0), #$83
+    (49,2,3,0), #$84
+    (47,2,3,0), #$85
+    (48,2,3,0), #$86
+    (60,2,3,0), #$87
+    (22,0,2,0), #$88
+    (33,1,2,0), #$89
+    (53,0,2,0), #$8a
+    (68,1,2,0), #$8b
+    (49,7,4,0), #$8c
+    (47,7,4,0), #$8d
+    (48,7,4,0), #$8e
+    (60,7,4,0), #$8f
+    (3,11,2,1), #$90    ###
+    (47,6,6,0), #$91
+    (64,0,0,0), #$92
+    (71,6,6,0), #$93
+    (49,3,4,0), #$94
+    (47,3,4,0), #$95
+    (48,4,4,0), #$96
+    (60,4,4,0), #$97
+    (55,0,2,0), #$98
+    (47,9,5,0), #$99
+    (54,0,2,0), #$9a
+    (74,9,5,0), #$9b
+    (72,8,5,0), #$9c
+    (47,8,5,0), #$9d
+    (73,9,5,0), #$9e
+    (71,9,5,0), #$9f
+    (31,1,2,0), #$a0    ###
+    (29,5,6,0), #$a1
+    (30,1,2,0), #$a2
+    (61,5,6,0), #$a3
+    (31,2,3,0), #$a4
+    (29,2,3,0), #$a5
+    (30,2,3,0), #$a6
+    (61,2,3,0), #$a7
+    (51,0,2,0), #$a8
+    (29,1,2,0), #$a9
+    (50,0,2,0), #$aa
+    (61,1,2,0), #$ab
+    (31,7,4,0), #$ac
+    (29,7,4,0), #$ad
+    (30,7,4,0), #$ae
+    (61,7,4,0), #$af
+    (4,11,2,1), #$b0    ###
+    (29,6,5,1), #$b1
+    (64,0,0,0), #$b2
+    (61,6,5,1), #$b3
+    (31,3,4,0), #$b4
+    (29,3,4,0), #$b5
+    (30,4,4,0), #$b6
+    (61,4,4,0), #$b7
+    (16,0,2,0), #$b8
+    (29,9,4,1), #$b9
+    (52,0,2,0), #$ba
+    (75,9,4,1), #$bb
+    (31,8,4,1), #$bc
+    (29,8,4,1), #$bd
+    (30,9,4,1), #$be
+    (61,9,4,1), #$bf
+    (19,1,2,0), #$c0    ###
+    (17,5,6,0), #$c1
+    (33,1,2,0), #$c2
+    (62,5,8,0), #$c3
+    (19,2,3,0), #$c4
+    (17,2,3,0), #$c5
+    (20,2,5,0), #$c6
+    (62,2,5,0), #$c7
+    (26,0,2,0), #$c8
+    (17,1,2,0), #$c9
+    (21,0,2,0), #$ca
+    (69,1,2,0), #$cb
+    (19,7,4,0), #$cc
+    (17,7,4,0), #$cd
+    (20,7,6,0), #$ce
+    (62,7,6,0), #$cf
+    (8,11,2,1), #$d0    ###
+    (17,6,5,1), #$d1
+    (64,0,0,0), #$d2
+    (62,6,8,0), #$d3
+    (33,3,4,0), #$d4
+    (17,3,4,0), #$d5
+    (20,3,6,0), #$d6
+    (62,3,6,0), #$d7
+    (14,0,2,0), #$d8
+    (17,9,4,1), #$d9
+    (33,0,2,0), #$da
+    (62,9,7,0), #$db
+    (33,8,4,1), #$dc
+    (17,8,4,1), #$dd
+    (20,8,7,0), #$de
+    (62,8,7,0), #$df
+    (18,1,2,0), #$e0    ###
+    (43,5,6,0), #$e1
+    (33,1,2,0), #$e2
+    (63,5,8,0), #$e3
+    (18,2,3,0), #$e4
+    (43,2,3,0), #$e5
+    (24,2,5,0), #$e6
+    (63,2,5,0), #$e7
+    (25,0,2,0), #$e8
+    (43,1,2,0), #$e9
+    (33,0,2,0), #$ea
+    (43,1,2,0), #$eb
+    (18,7,4,0), #$ec
+    (43,7,4,0), #$ed
+    (24,7,6,0), #$ee
+    (63,7,6,0), #$ef
+    (5,11,2,1), #$f0    ###
+    (43,6,5,1), #$f1
+    (64,0,0,0), #$f2
+    (63,6,8,0), #$f3
+    (33,3,4,0), #$f4
+    (43,3,4,0), #$f5
+    (24,3,6,0), #$f6
+    (63,3,6,0), #$f7
+    (45,0,2,0), #$f8
+    (43,9,4,1), #$f9
+    (33,0,2,0), #$fa
+    (63,9,7,0), #$fb
+    (33,8,4,1), #$fc
+    (43,8,4,1), #$fd
+    (24,8,7,0), #$fe
+    (63,8,7,0)  #$ff
+)
+
+
+class DissectorError(Exception) :
+    """Raised for any error while disassembling, e.g. unreadable files."""
+
+
+
+class DissectorCancelled(DissectorError) :
+    """Raised by a progress function to stop a running disassembly."""
+
+
+
+FLAG_LABEL_POSSIBLE = 0x01
+FLAG_CYCLES_PLUS = 0x02
+FLAG_RELATIVE = 0x04
+FLAG_DATA = 0x08
+
+OPCODE_TYPE_DATA = 8
+
+XREF_TYPE = ('', 'jsr', 'jump', '', '', 'branch', 'load', 'store')    #indexed by opcode type
+XREF_COMMENT_MAX = 8    #references listed at a label definition
+
+def _create_chars_table (
+    ranges
+) :
+    # 256 byte translation table, ranges of (first code, first character, count),
+    # everything else is shown as '.'
+    table = bytearray(b'.' * 256)
+    for first, char, count in ranges :
+        for index in range(count) : table[first+index] = ord(char)+index
+    return bytes(table)
+
+
+DUMP_CHARS = {  #character sets of the memory-dump, arrows are shown as '^' and '_'
+    'petscii' : _create_chars_table((
+        (0x20, ' ', 0x40),  #space to arrow left
+        (0xa0, ' ', 1)      #shifted space
+    )),
+    'screen' : _create_chars_table((
+        (0x00, '@', 0x20),  #'@' to arrow left
+        (0x20, ' ', 0x20),  #space to '?'
+        (0x80, '@', 0x20),  #reversed characters
+        (0xa0, ' ', 0x20)
+    ))
+}
+
+OPCODE_TYPE_NAME = ('normal', 'jsr', 'jump', 'return', 'illegal', 'branch', 'load', 'store', 'data')
+MODE_NAME = tuple(this_mode['name'].split(' ')[0] for this_mode in MODE)   #'imm', 'zp', ...
+
+COLUMNS_MAGIC = b'DSCOLS'
+COLUMNS_VERSION = 1     #increase when the columns file changes
+COLUMNS = ( #column name, typecode; all values are stored little-endian
+    ('pos', 'i'),
+    ('value0', 'B'),
+    ('value1', 'B'),
+    ('value2', 'B'),
+    ('length', 'B'),
+    ('target_address', 'i'),
+    ('opcode_number', 'B'),
+    ('mode', 'B'),
+    ('cycles', 'B'),
+    ('flags', 'B')
+)
+
+
+def _create_decode_table (
+    code,
+    opcode,
+    mode
+) :
+    # flatten CODE, OPCODE and MODE into one entry per opcode byte:
+    # (opcode_number, name, type, mode, length, cycles, flags)
+    # relative branches are already turned into absolute mode with length 2
+    decode_table = []
+    for my_opcode_number, my_mode, my_cycles, my_cycles_plus in code :
+        my_length = mode[my_mode]['length']
+        my_flags = 0
+        if (mode[my_mode]['label_possible']) : my_flags |= FLAG_LABEL_POSSIBLE
+        if (my_cycles_plus) : my_flags |= FLAG_CYCLES_PLUS
+        if (my_mode == 11) :    #relative PC
+            my_mode = 7 #absolute = $0000
+            my_length = 2
+            my_flags |= FLAG_RELATIVE
+        decode_table.append((
+            my_opcode_number,
+            opcode[my_opcode_number]['name'],
+            opcode[my_opcode_number]['type'],
+            my_mode,
+            my_length,
+            my_cycles,
+            my_flags
+        ))
+    return tuple(decode_table)
+
+
+DECODE = _create_decode_table(CODE, OPCODE, MODE)
+
+
+OPERAND_TEMPLATE = (    #instruction per mode: (plain, with label); {0} = opcode, {1} = target
+    ('{0}', '{0}'),                                 #none
+    ('{0} #${1:02x}', '{0} #{1}'),                  #imm = #$00
+    ('{0} ${1:02x}', '{0} {1}'),                    #zp = $00
+    ('{0} ${1:02x},x', '{0} {1},x'),                #zpx = $00,X
+    ('{0} ${1:02x},y', '{0} {1},y'),                #zpy = $00,Y
+    ('{0} (${1:02x},x)', '{0} ({1},x)'),            #izx = ($00,X)
+    ('{0} (${1:02x}),y', '{0} ({1}),y'),            #izy = ($00),Y
+    ('{0} ${1:04x}', '{0} {1}'),                    #abs = $0000
+    ('{0} ${1:04x},x', '{0} {1},x'),                #abx = $0000,X
+    ('{0} ${1:04x},y', '{0} {1},y'),                #aby = $0000,Y
+    ('{0} (${1:04x})', '{0} ({1})'),                #ind = ($0000)
+    ('{0} ${1:04x}', '{0} {1}')                     #rel = $0000 (PC-relative)
+)
+
+
+
+def register_assembler(
+    name,
+    comment,
+    label,
+    byte,
+    origin = '* = ${0:04x}',
+    operands = None
+) :
+    """Add an assembler back-end for --asmtype name.
+
+    comment, label and byte are the comment prefix, the suffix of label
+    definitions and the byte directive, origin is the format of the start
+    address. operands maps modes to (plain, with label) format strings that
+    replace the ones of OPERAND_TEMPLATE. The templates are compiled once,
+    writing an instruction is one lookup and one format call.
+    """
+    templates = list(OPERAND_TEMPLATE)
+    if (operands is not None) :
+        for my_mode, my_templates in operands.items() : templates[my_mode] = my_templates
+    ASSEMBLERS[name] = {
+        'comment' : comment,
+        'label' : label,
+        'byte' : byte,
+        'origin' : origin.format,
+        'operand' : (   #indexed by label set, then mode
+            tuple(my_templates[0].format for my_templates in templates),
+            tuple(my_templates[1].format for my_templates in templates)
+        )
+    }
+    return None
+
+
+register_assembler('acme', ';', '', '!byte')
+register_assembler('kickass', '//', ':', '.byte')
+register_assembler('64tass', ';', '', '.byte')
+register_assembler('ca65', ';', ':', '.byte', '.org ${0:04x}')
+
+
+class Disassembly :
+    """Decoded instructions stored column-wise in parallel arrays.
+
+    Iterating (or indexing) yields one dict per instruction with the keys
+    pos, value0, value1, value2, length, target_address, opcode_number,
+    opcode, opcode_type, mode, label_possible, cycles and cycles_plus.
+    """
+
+    __slots__ = (
+        'pos', 'value0', 'value1', 'value2', 'length', 'target_address',
+        'opcode_number', 'mode', 'cycles', 'flags'
+    )
+
+    def __init__(self) :
+        self.pos = array.array('i')
+        self.value0 = array.array('B')
+        self.value1 = array.array('B')
+        self.value2 = array.array('B')
+        self.length = array.array('B')
+        self.target_address = array.array('i')
+        self.opcode_number = array.array('B')
+        self.mode = array.array('B')
+        self.cycles = array.array('B')
+        self.flags = array.array('B')
+
+    def append(
+        self,
+        pos,
+        value0,
+        value1,
+        value2,
+        length,
+        target_address,
+        opcode_number,
+        mode,
+        cycles,
+        flags
+    ) :
+        self.pos.append(pos)
+        self.value0.append(value0)
+        self.value1.append(value1)
+        self.value2.append(value2)
+        self.length.append(length)
+        self.target_address.append(target_address)
+        self.opcode_number.append(opcode_number)
+        self.mode.append(mode)
+        self.cycles.append(cycles)
+        self.flags.append(flags)
+
+    def extend(
+        self,
+        other,
+        start = 0
+    ) :
+        # append the instructions of other from index start on
+        for name in self.__slots__ :
+            getattr(self, name).extend(getattr(other, name)[start:])
+
+    def __len__(self) :
+        return len(self.pos)
+
+    def __getitem__(self, index) :
+        opcode_number, opcode, opcode_type, _, _, _, _ = DECODE[self.value0[index]]
+        flags = self.flags[index]
+        if (flags & FLAG_DATA) :
+            opcode = None
+            opcode_type = OPCODE_TYPE_DATA
+        return {
+            "pos" : self.pos[index],
+            "value0" : self.value0[index],
+            "value1" : self.value1[index],
+            "value2" : self.value2[index],
+            "length" : self.length[index],
+            "target_address" : self.target_address[index],
+            "opcode_number" : opcode_number,
+            "opcode" : opcode,
+            "opcode_type" : opcode_type,
+            "mode" : self.mode[index],
+            "label_possible" : (flags & FLAG_LABEL_POSSIBLE) != 0,
+            "cycles" : self.cycles[index],
+            "cycles_plus" : (flags & FLAG_CYCLES_PLUS) >> 1
+        }
+
+    def __iter__(self) :
+        for index in range(len(self.pos)) :
+            yield self[index]
+
+
+
+
+#my_label = [ [0] *2 for i in range(16) ]    #32 bytes multidimensional list
+
+
+
+
+
+
+def _write_header (
+    output,
+    user_asm_type,
+    PROGNAME,
+    VERSION,
+    DATUM,
+    filename_in,
+    my_address,
+    my_offset,
+    my_limit
+) :
+    string_comment = ASSEMBLERS[user_asm_type]['comment']
+    output.write('%s Source generated by %s v%s [%s] *** by fieserWolF\n' % (string_comment, PROGNAME, VERSION, DATUM))
+    output.write('%s FILENAME: %s, address: $%04x, offset: $%04x, length: $%04x\n' %(string_comment, filename_in,my_address,my_offset,my_limit))
+    output.write('%s---------------------------------------------------------------------------\n' %(string_comment))
+    output.write('\n')
+    return None
+
+
+
+def _write_memory_dump (
+    output,
+    buffer,
+    my_address,
+    user_chars = None
+) :
+    # one row of 16 bytes per write, optionally followed by the bytes as characters
+    chars_table = None
+    if (user_chars is not None) : chars_table = DUMP_CHARS[user_chars]
+    view = memoryview(buffer)
+    output.write('memory:\n\n')
+    for count in range(0, len(view), 16) :
+        row = view[count:count+16]
+        my_line = '$%04x  %s ' % (count+my_address, row[:8].hex(' '))
+        if (len(row) > 8) : my_line += ' %s ' % row[8:].hex(' ')
+        if (chars_table is not None) :
+            my_line += ' '*(3*(16-len(row)) + (len(row) <= 8))
+            my_line += ' |%s|' % bytes(row).translate(chars_table).decode('ascii')
+        if (len(row) == 16) : my_line += '\n'
+        output.write(my_line)
+    output.write('\n\n\n\n\n')
+    return None
+
+
+
+def _write_disassembly (
+    output,
+    disassembly,
+    my_address,
+    user_asm_type,
+    user_show_cycles,
+    user_illegals,
+    label_index,
+    xref_index = None,
+    cancel = None
+) :
+    string_comment = ASSEMBLERS[user_asm_type]['comment']
+    string_label = ASSEMBLERS[user_asm_type]['label']
+    string_byte = ASSEMBLERS[user_asm_type]['byte']
+    operand = ASSEMBLERS[user_asm_type]['operand']
+
+    labels_by_address = label_index['address']
+    labels_by_definition = label_index['definition']
+    
+    CYCLES_PLUS_STRING = ['','+']
+    cancel_check = CANCEL_CHECK_INTERVAL
+    output.write('disassembly:\n\n')
+
+
+
+    # start address entry point
+    output.write('\t\t\t%s\n\n' % ASSEMBLERS[user_asm_type]['origin'](my_address))
+
+
+    for pos, value0, value1, value2, length, target_address, mode, cycles, flags in zip(
+        disassembly.pos,
+        disassembly.value0,
+        disassembly.value1,
+        disassembly.value2,
+        disassembly.length,
+        disassembly.target_address,
+        disassembly.mode,
+        disassembly.cycles,
+        disassembly.flags
+    ) :
+        cancel_check -= 1
+        if (cancel_check == 0) :
+            cancel_check = CANCEL_CHECK_INTERVAL
+            if ((cancel is not None) and cancel.is_set()) : raise DissectorCancelled('Cancelled.')
+
+        _, opcode, opcode_type, _, _, _, _ = DECODE[value0]
+        if (flags & FLAG_DATA) : opcode_type = OPCODE_TYPE_DATA
+
+        #prepare address
+        my_address = '$%04x\t' % pos
+
+        #prepare memory data
+        my_memory = ''
+        my_memory_byte = ''
+        if (length == 1) : 
+            my_memory = '%02x\t\t\t' % (value0)
+            my_memory_byte = '$%02x' % (value0)
+        if (length == 2) : 
+            my_memory = '%02x %02x\t\t' % (value0, value1)
+            my_memory_byte = '$%02x,$%02x' % (value0, value1)
+        if (length == 3) : 
+            my_memory = '%02x %02x %02x\t' % (value0, value1, value2)
+            my_memory_byte = '$%02x,$%02x,$%02x' % (value0, value1, value2)
+
+        address_and_memory = my_address + my_memory
+
+    
+
+        #write own labels
+        for my_label in labels_by_definition.get(pos, ()) :
+            if (
+                (xref_index is not None) and
+                (my_label['address'] in xref_index)
+            ) :
+                output.write('%s%s\t\t\t%sreferenced from %s\n' % (
+                    my_label['name'],
+                    string_label,
+                    string_comment,
+                    _xref_string(disassembly, xref_index[my_label['address']], XREF_COMMENT_MAX)
+                ))
+            else : output.write('%s%s\n' % (my_label['name'], string_label))
+        
+
+       
+        #write opcode
+        target = target_address
+        label_set = False
+        if (flags & FLAG_LABEL_POSSIBLE) :    # do not replace imm = #$00 with label
+            my_label = labels_by_address.get(target)
+            if (my_label is not None) :
+                target = my_label['name']
+                label_comment = my_label['comment']
+                if (my_label['add'] > 0) : target = target+ '+' +str(my_label['add'])
+                label_set = True
+
+
+
+        #if (isinstance(target,str) == True) :
+        #    print('target is a string!')
+
+
+
+        my_line = '\t\t\t'
+
+        # deal with illegal opcodes and data:
+        if (
+            (
+                (opcode_type == 4) & # illegal
+                (user_illegals == False)
+            ) |
+            (opcode_type == OPCODE_TYPE_DATA)
+        ) :
+            my_line += string_byte + ' ' + my_memory_byte
+                
+                
+        else : my_line += operand[label_set][mode](opcode, target)
+
+
+
+        #write comments
+        if (len(my_line) <= 6)  : my_line += '\t'
+        if (len(my_line) <= 10)  : my_line += '\t'
+        if (len(my_line) <= 14)  : my_line += '\t'
+        if (len(my_line) <= 18)  : my_line += '\t'
+        if (len(my_line) <= 22)  : my_line += '\t'
+        if (len(my_line) <= 26)  : my_line += '\t'
+        my_line += ('%s' % string_comment)
+
+
+        #show memory dump
+        my_line += address_and_memory
+
+
+
+        if (
+            (user_show_cycles == True) &
+            (opcode_type != OPCODE_TYPE_DATA)
+        ) :
+            my_line += ('%d%scycles ' % (
+                    cycles,
+                    CYCLES_PLUS_STRING[(flags & FLAG_CYCLES_PLUS) >> 1]
+                )
+            )
+        
+        if (opcode_type == 1) : #jsr
+            my_line += 'jump to & return from'
+            if (label_set == True) : my_line += (' $%04x [%s]\n' % (target_address, label_comment))
+            else: my_line += '\n'
+
+        if (opcode_type == 2) : #jump
+            my_line += 'jump'
+            if (label_set == True) : my_line += (' to $%04x [%s]\n' % (target_address, label_comment))
+            else: my_line += '\n'
+            my_line += ('%s------------------------------------\n' %(string_comment))
+
+        if (opcode_type == 3) :    # rts/rti
+            my_line += ('\n')
+            my_line += ('%s------------------------------------\n' %(string_comment))
+
+        if (opcode_type == 4) : # illegal
+            my_line += ('illegal opcode [$%02x]'% (value0))
+
+        if (opcode_type == 5) : #bne
+            my_line += ('conditional branch')
+            if (label_set == True) : my_line += (' to $%04x [%s]\n' % (target_address, label_comment))
+            else: my_line += ('\n')
+
+        if (opcode_type == 6) : #load
+            if (label_set == True) : my_line += ('load from $%04x [%s]' % (target_address, label_comment))
+
+        if (opcode_type == 7) : #store
+            if (label_set == True) : my_line += ('store at $%04x [%s]' % (target_address, label_comment))
+
+
+        my_line += ('\n')
+        
+        output.write(my_line)
+
+    return None
+
+
+
+def _instruction_records (
+    disassembly,
+    label_index
+) :
+    # one json-compatible dict per decoded instruction, straight from the columns
+    labels_by_address = label_index['address']
+    for pos, value0, value1, value2, length, target_address, mode, cycles, flags in zip(
+        disassembly.pos,
+        disassembly.value0,
+        disassembly.value1,
+        disassembly.value2,
+        disassembly.length,
+        disassembly.target_address,
+        disassembly.mode,
+        disassembly.cycles,
+        disassembly.flags
+    ) :
+        _, mnemonic, opcode_type, _, _, _, _ = DECODE[value0]
+        if (flags & FLAG_DATA) :
+            mnemonic = None
+            opcode_type = OPCODE_TYPE_DATA
+        if (flags & FLAG_RELATIVE) : mode = 11
+        record = {
+            'pos' : pos,
+            'bytes' : [value0, value1, value2][:length],
+            'mnemonic' : mnemonic,
+            'mode' : MODE_NAME[mode],
+            'target' : None,
+            'label' : None,
+            'cycles' : cycles,
+            'cycles_plus' : (flags & FLAG_CYCLES_PLUS) != 0,
+            'type' : OPCODE_TYPE_NAME[opcode_type]
+        }
+        if (flags & FLAG_LABEL_POSSIBLE) :
+            record['target'] = target_address
+            my_label = labels_by_address.get(target_address)
+            if (my_label is not None) :
+                record['label'] = my_label['name']
+                if (my_label['add'] > 0) : record['label'] += '+' +str(my_label['add'])
+        yield record
+
+
+
+def _write_jsonl (
+    output,
+    disassembly,
+    label_index
+) :
+    # json lines, one object per instruction
+    encoder = json.JSONEncoder(separators=(',', ':'))
+    for record in _instruction_records(disassembly, label_index) :
+        output.write(encoder.encode(record))
+        output.write('\n')
+    return None
+
+
+
+def _write_columns (
+    output,
+    disassembly
+) :
+    """Write the instruction table column by column to the binary file-like output.
+
+    Layout: magic "DSCOLS", version (byte), number of columns (byte),
+    number of instructions (uint32), then name (16 bytes) and typecode
+    (1 byte) of every column, then the data of every column in the same
+    order. All numbers are little-endian, "B" is uint8, "i" is int32.
+    """
+    output.write(struct.pack('<6sBBI', COLUMNS_MAGIC, COLUMNS_VERSION, len(COLUMNS), len(disassembly)))
+    for name, typecode in COLUMNS :
+        output.write(struct.pack('<16sc', name.encode('ascii'), typecode.encode('ascii')))
+    for name, typecode in COLUMNS :
+        column = getattr(disassembly, name)
+        if (column.typecode != typecode) : column = array.array(typecode, column)
+        if (sys.byteorder == 'big') :
+            column = array.array(typecode, column)
+            column.byteswap()
+        output.write(column.tobytes())
+    return None
+
+
+
+def read_columns (
+    filename
+) :
+    """Read a file written with --columns and return it as Disassembly."""
+    try:
+        with open(filename, 'rb') as file_in :
+            data = file_in.read()
+    except IOError as err:
+        raise DissectorError("I/O error: {0}".format(err))
+
+    header_size = struct.calcsize('<6sBBI')
+    column_size = struct.calcsize('<16sc')
+    try:
+        magic, version, column_count, count = struct.unpack_from('<6sBBI', data)
+    except struct.error :
+        raise DissectorError('error: "%s" is no columns file' % filename)
+    if ((magic != COLUMNS_MAGIC) or (version != COLUMNS_VERSION)) :
+        raise DissectorError('error: "%s" is no columns file of version %d' % (filename, COLUMNS_VERSION))
+
+    disassembly = Disassembly()
+    pos = header_size+column_count*column_size
+    for index in range(column_count) :
+        name, typecode = struct.unpack_from('<16sc', data, header_size+index*column_size)
+        name = name.rstrip(b'\0').decode('ascii')
+        column = array.array(typecode.decode('ascii'))
+        size = count*column.itemsize
+        column.frombytes(data[pos:pos+size])
+        if (len(column) != count) : raise DissectorError('error: "%s" is truncated' % filename)
+        if (sys.byteorder == 'big') : column.byteswap()
+        pos += size
+        if (name in Disassembly.__slots__) :
+            target = getattr(disassembly, name)
+            if (column.typecode != target.typecode) : column = column.tolist()
+            target.extend(column)
+    return disassembly
+
+
+
+def _write_labels (
+    output,
+    user_asm_type,
+    labels
+) :
+    string_comment = ASSEMBLERS[user_asm_type]['comment']
+
+
+    # write labels
+    output.write('\n')
+    output.write('\n')
+    output.write('\n')
+    output.write('\n')
+    output.write('\n')
+    output.write('labels:\n\n')
+    #for a in range(0,len(label_def)) :
+    
+    for a in range(0,(MAX_AREA_TYPE+1)) :
+        for data in labels :
+            if (data['type'] == a) :
+                output.write("%s\t= " % data['name'])    #name
+                output.write("$%04x\t" % data['address']) #address
+                output.write('%s' % string_comment)
+                output.write("%s" % data['comment']) #comment
+                output.write("\n")
+
+
+
+    output.write('\n')
+    return None
+
+
+def _write_xrefs (
+    output,
+    user_asm_type,
+    disassembly,
+    xref_index,
+    label_index
+) :
+    string_comment = ASSEMBLERS[user_asm_type]['comment']
+
+    output.write('\n')
+    output.write('\n')
+    output.write('\n')
+    output.write('\n')
+    output.write('\n')
+    output.write('xrefs:\n\n')
+
+    for address in sorted(xref_index) :
+        my_label = label_index['address'].get(address)
+        if (my_label is not None) : output.write('%s\t' % my_label['name'])
+        output.write('$%04x\t%s%s\n' % (
+            address,
+            string_comment,
+            _xref_string(disassembly, xref_index[address], 0)
+        ))
+
+    output.write('\n')
+    return None
+
+
+
+def _xref_string (
+    disassembly,
+    references,
+    max_references
+) :
+    # "$0823 (jsr), $0816 (load), ...", max_references = 0 lists all
+    parts = []
+    for index in references :
+        if (
+            (max_references > 0) &
+            (len(parts) >= max_references)
+        ) :
+            parts.append('...')
+            break
+        xref_type = XREF_TYPE[DECODE[disassembly.value0[index]][2]]
+        if (xref_type != '') : parts.append('$%04x (%s)' % (disassembly.pos[index], xref_type))
+        else : parts.append('$%04x' % disassembly.pos[index])
+    return ', '.join(parts)
+
+
+
+def _read_file(
+    filename_in,
+    my_offset,
+    my_limit,
+    log = print
+) :
+    # filename_in can be a filename, "-" for stdin or an in-memory buffer
+    # (bytes, bytearray, memoryview). The returned buffer is a zero-copy slice.
+    if (isinstance(filename_in, (bytes, bytearray, memoryview))) :
+        return _slice_buffer(memoryview(filename_in), my_offset, my_limit)
+
+    if (filename_in == '-') :
+        log ("    Reading from stdin...")
+        return _slice_buffer(memoryview(sys.stdin.buffer.read()), my_offset, my_limit)
+
+	#open input file
+    log ("    Opening file \"%s\" for reading..." % filename_in)
+    try:
+        file_in = open(filename_in , "rb")
+    except IOError as err:
+        raise DissectorError("I/O error: {0}".format(err))
+
+    with file_in :
+        file_size = os.fstat(file_in.fileno()).st_size
+        if (file_size-my_offset >= MMAP_THRESHOLD) :
+            # large images are mapped instead of copied into memory
+            mapped = mmap.mmap(file_in.fileno(), 0, access=mmap.ACCESS_READ)
+            return _slice_buffer(memoryview(mapped), my_offset, my_limit)
+
+        # small files: seek straight to the offset and read in one go
+        file_in.seek(my_offset)
+        if (my_limit != 0) : buffer = file_in.read(my_limit)
+        else : buffer = file_in.read()
+
+    return buffer
+
+
+
+def _slice_buffer(
+    buffer,
+    my_offset,
+    my_limit
+) :
+    if (my_limit != 0) : return buffer[my_offset:my_offset+my_limit]
+    return buffer[my_offset:]
+
+
+
+def _open_output_file(
+    filename_out,
+    log = print
+) :
+    # "-" writes to stdout, output is streamed while disassembling
+    if (filename_out == '-') : return sys.stdout
+
+    log ("    Opening file \"%s\" for writing..." % filename_out)
+    try:
+        file_out = open(filename_out , "w", buffering=OUTPUT_BUFFER_SIZE)
+    except IOError as err:
+        raise DissectorError("I/O error: {0}".format(err))
+    return file_out
+
+
+
+def _save_file(
+    file_out
+) :
+    file_out.flush()
+    if (file_out is not sys.stdout) : file_out.close()
+    return None
+
+
+
+@contextlib.contextmanager
+def _replace_file(
+    filename_out,
+    binary = False,
+    log = print
+) :
+    # yields a file written under a temporary name next to filename_out, which
+    # replaces filename_out only if the block succeeds: a failed or cancelled
+    # run leaves an existing file untouched. "-" yields stdout.
+    if (filename_out == '-') :
+        if (binary == True) : yield sys.stdout.buffer
+        else : yield sys.stdout
+        sys.stdout.flush()
+        return
+
+    log ("    Opening file \"%s\" for writing..." % filename_out)
+    filename_temp = '%s.%d-%d.tmp' % (filename_out, os.getpid(), threading.get_ident())
+    try:
+        file_out = open(filename_temp, 'xb' if binary else 'x', buffering=OUTPUT_BUFFER_SIZE)
+    except IOError as err:
+        raise DissectorError("I/O error: {0}".format(err))
+
+    try:
+        with file_out :
+            yield file_out
+        os.replace(filename_temp, filename_out)
+    except BaseException as err:
+        try:
+            os.remove(filename_temp)
+        except OSError :
+            pass
+        if (isinstance(err, OSError)) : raise DissectorError("I/O error: {0}".format(err))
+        raise
+
+
+
+def disassemble_to_file(
+    data,
+    address,
+    filename_out,
+    options = None
+) :
+    """Like disassemble(), but write the source code to the file filename_out.
+
+    The file is only replaced when the disassembly succeeded, "-" writes to stdout.
+    """
+    context = {
+        'stats' : None,
+        'stats_memory' : False,
+        'progress' : None
+    }
+    log = _no_log
+    if (options is not None) :
+        if (options.get('log') is not None) : log = options['log']
+        context['stats'] = options.get('stats')
+        context['stats_memory'] = options.get('stats_memory', False)
+
+    with _replace_file(filename_out, False, log) as file_out :
+        result = disassemble(data, address, options, file_out)
+        _run_stage( context, 'save_file', _save_file, file_out )
+    return result
+
+
+
+# numpy module once imported by _import_numpy, False if it is not installed
+_numpy = None
+
+def _import_numpy() :
+    # numpy is optional, only used to speed up decoding of large images,
+    # and imported on first use to keep the start-up of small runs short
+    global _numpy
+    if (_numpy is None) :
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    if (_numpy == False) : return None
+    return _numpy
+
+
+
+def _create_disassembly(
+    buffer,
+    my_address
+) :
+    global DECODE
+
+    if (
+        (len(buffer) >= NUMPY_THRESHOLD) and
+        (_import_numpy() is not None)
+    ) :
+        return _create_disassembly_numpy(buffer, my_address)
+
+    return _decode_range(buffer, my_address, 0, len(buffer))
+
+
+
+def _decode_range(
+    buffer,
+    my_address,
+    pos,
+    end
+) :
+    # linear sweep over the instructions starting at pos up to end,
+    # operands may be read beyond end
+    global DECODE
+
+    disassembly = Disassembly()
+    flag_continue = True
+    while flag_continue :
+        if (pos >= end) : break
+        if ((pos+0) < len(buffer)) : my_value0 = buffer[pos+0]
+        else: break
+        if ((pos+1) < len(buffer)) : my_value1 = buffer[pos+1]
+        else:
+            my_value1 = 0
+            flag_continue = False
+        if ((pos+2) < len(buffer)) : my_value2 = buffer[pos+2]
+        else:
+            my_value2 = 0
+            flag_continue = False
+
+
+       
+        my_opcode_number, _, _, my_mode, my_length, my_cycles, my_flags = DECODE[my_value0]
+
+        # deal with 8 or 16 bit addresses
+        if (my_flags & FLAG_RELATIVE) :    #relative PC, decoded as absolute = $0000
+            if (my_value1 >= 128) : target_address = pos+my_address+2-(256-my_value1)
+            else : target_address = pos+my_address+2+my_value1
+        elif (my_length == 3) : target_address = (my_value2 << 8)+my_value1
+        else : target_address = my_value1
+
+        disassembly.append(
+            pos+my_address,
+            my_value0,
+            my_value1,
+            my_value2,
+            my_length,
+            target_address,
+            my_opcode_number,
+            my_mode,
+            my_cycles,
+            my_flags
+        )
+
+        pos += my_length
+        
+    return disassembly
+
+
+
+
+
+# label table of a worker process of the parallel disassembly, set by _parallel_init
+_parallel_label_table = None
+
+def _parallel_init(
+    table
+) :
+    global _parallel_label_table
+    _parallel_label_table = table
+    return None
+
+
+
+def _decode_chunk(
+    chunk,
+    my_address,
+    length
+) :
+    # chunk holds the bytes to decode plus up to two operand bytes following them
+    return _decode_range(chunk, my_address, 0, length)
+
+
+
+def _create_disassembly_parallel(
+    buffer,
+    my_address,
+    executor,
+    jobs
+) :
+    """Decode buffer in jobs chunks in worker processes, same result as _create_disassembly.
+
+    Each chunk is decoded from its first byte on, which may be inside an
+    instruction of the previous chunk. While stitching, the instructions are
+    decoded again from the end of the previous chunk until they meet an
+    instruction start of the chunk, from there on both streams are the same.
+    """
+    chunk_size = -(-len(buffer) // jobs)
+    bounds = [(start, min(start+chunk_size, len(buffer))) for start in range(0, len(buffer), chunk_size)]
+    chunks = executor.map(
+        _decode_chunk,
+        [bytes(buffer[start:end+2]) for start, end in bounds],
+        [my_address+start for start, end in bounds],
+        [end-start for start, end in bounds]
+    )
+
+    disassembly = Disassembly()
+    pos = 0
+    for (start, end), chunk in zip(bounds, chunks) :
+        chunk_starts = {my_pos-my_address : index for index, my_pos in enumerate(chunk.pos)}
+        while (
+            (pos < end) and
+            (pos not in chunk_starts)
+        ) :
+            # resynchronise one instruction at a time
+            my_instruction = _decode_range(buffer, my_address, pos, pos+1)
+            disassembly.extend(my_instruction)
+            pos += my_instruction.length[0]
+            if (pos-my_instruction.length[0]+2 >= len(buffer)) : return disassembly   #end of buffer, as in _decode_range
+        if (pos >= end) : continue
+        disassembly.extend(chunk, chunk_starts[pos])
+        pos = disassembly.pos[-1]-my_address+disassembly.length[-1]
+        if (disassembly.pos[-1]-my_address+2 >= len(buffer)) : return disassembly   #the chunk reached the end of buffer
+    return disassembly
+
+
+
+def _create_disassembly_numpy(
+    buffer,
+    my_address
+) :
+    # same linear sweep as _create_disassembly, done with array operations:
+    # instruction boundaries are found by pointer doubling over the
+    # next-instruction table, then all columns are gathered at once
+    global DECODE
+
+    numpy = _import_numpy()
+    data = numpy.frombuffer(buffer, dtype=numpy.uint8)
+    size = len(data)
+    disassembly = Disassembly()
+    if (size == 0) : return disassembly
+
+    length_table = numpy.array([entry[4] for entry in DECODE], dtype=numpy.int64)
+
+    # next instruction for every position, the sweep stops after the first
+    # instruction that has no room for two operand bytes (position size is the sink)
+    positions = numpy.arange(size+1, dtype=numpy.int64)
+    jump = numpy.empty(size+1, dtype=numpy.int64)
+    jump[:size] = positions[:size] + length_table[data]
+    jump[max(size-2, 0):] = size
+    jump = numpy.minimum(jump, size)
+
+    # collect the chain starting at 0 by doubling: starts of 2^k instructions
+    starts = numpy.zeros(1, dtype=numpy.int64)
+    while starts[-1] != size :
+        starts = numpy.concatenate((starts, jump[starts]))
+        jump = jump[jump]
+    starts = starts[:numpy.argmax(starts == size)]
+
+    padded = numpy.zeros(size+2, dtype=numpy.int64)
+    padded[:size] = data
+    value0 = padded[starts]
+    value1 = padded[starts+1]
+    value2 = padded[starts+2]
+
+    columns = numpy.array([entry[:1]+entry[3:] for entry in DECODE], dtype=numpy.int64)[value0]
+    opcode_number = columns[:,0]
+    mode = columns[:,1]
+    length = columns[:,2]
+    cycles = columns[:,3]
+    flags = columns[:,4]
+
+    pos = starts+my_address
+    target_address = numpy.where(length == 3, (value2 << 8)+value1, value1)
+    target_address = numpy.where(
+        (flags & FLAG_RELATIVE) != 0,
+        pos+2+numpy.where(value1 >= 128, value1-256, value1),
+        target_address
+    )
+
+    for name, column in (
+        ('pos', pos),
+        ('value0', value0),
+        ('value1', value1),
+        ('value2', value2),
+        ('length', length),
+        ('target_address', target_address),
+        ('opcode_number', opcode_number),
+        ('mode', mode),
+        ('cycles', cycles),
+        ('flags', flags)
+    ) :
+        my_array = getattr(disassembly, name)
+        if (my_array.typecode == 'i') : dtype = 'i%d' % my_array.itemsize
+        else : dtype = 'u1'
+        my_array.frombytes(column.astype(dtype).tobytes())
+
+    return disassembly
+
+
+
+def _create_disassembly_flow(
+    buffer,
+    my_address,
+    entry_points,
+    user_illegals
+) :
+    # recursive-descent disassembly: follow the program flow from the entry
+    # points through jsr, jmp and branches, everything never reached is data
+    global DECODE
+
+    NOT_REACHED = 0
+    INSTRUCTION = 1
+    OPERAND = 2
+
+    size = len(buffer)
+    reached = bytearray(size)
+
+    worklist = []
+    for entry in entry_points : worklist.append(entry-my_address)
+
+    while (len(worklist) > 0) :
+        pos = worklist.pop()
+        while (
+            (pos >= 0) &
+            (pos < size)
+        ) :
+            if (reached[pos] != NOT_REACHED) : break    #already decoded or inside another instruction
+            my_value0 = buffer[pos]
+            my_opcode_number, _, my_opcode_type, my_mode, my_length, _, my_flags = DECODE[my_value0]
+            if (pos+my_length > size) : break
+            if (any(reached[pos+1:pos+my_length])) : break  #overlaps another instruction
+            if (
+                (my_opcode_type == 4) &    # illegal
+                (
+                    (user_illegals == False) |
+                    (my_opcode_number == 64)    #kil
+                )
+            ) : break
+
+            reached[pos] = INSTRUCTION
+            reached[pos+1:pos+my_length] = bytes([OPERAND]) * (my_length-1)
+
+            if (my_flags & FLAG_RELATIVE) :
+                if (buffer[pos+1] >= 128) : target_address = pos+my_address+2-(256-buffer[pos+1])
+                else : target_address = pos+my_address+2+buffer[pos+1]
+            elif (my_length == 3) : target_address = (buffer[pos+2] << 8)+buffer[pos+1]
+            else : target_address = None
+
+            if (my_opcode_type == 1) : worklist.append(target_address-my_address)  #jsr
+            if (my_opcode_type == 5) : worklist.append(target_address-my_address)  #branch
+            if (my_opcode_type == 2) :  #jump
+                if (my_mode != 10) : worklist.append(target_address-my_address)    #not indirect
+                break
+            if (my_opcode_type == 3) : break    #brk/rts/rti
+
+            pos += my_length
+
+    # decode all reached instructions, one data entry for every other byte
+    disassembly = Disassembly()
+    pos = 0
+    while (pos < size) :
+        my_value0 = buffer[pos]
+        if ((pos+1) < size) : my_value1 = buffer[pos+1]
+        else : my_value1 = 0
+        if ((pos+2) < size) : my_value2 = buffer[pos+2]
+        else : my_value2 = 0
+
+        if (reached[pos] != INSTRUCTION) :
+            disassembly.append(pos+my_address, my_value0, 0, 0, 1, 0, 0, 0, 0, FLAG_DATA)
+            pos += 1
+            continue
+
+        my_opcode_number, _, _, my_mode, my_length, my_cycles, my_flags = DECODE[my_value0]
+        if (my_flags & FLAG_RELATIVE) :
+            if (my_value1 >= 128) : target_address = pos+my_address+2-(256-my_value1)
+            else : target_address = pos+my_address+2+my_value1
+        elif (my_length == 3) : target_address = (my_value2 << 8)+my_value1
+        else : target_address = my_value1
+
+        disassembly.append(
+            pos+my_address,
+            my_value0,
+            my_value1,
+            my_value2,
+            my_length,
+            target_address,
+            my_opcode_number,
+            my_mode,
+            my_cycles,
+            my_flags
+        )
+        pos += my_length
+
+    return disassembly
+
+
+
+def _find_entry_points(
+    buffer,
+    my_address
+) :
+    # start address, 6502 hardware vectors and C64 cartridge start vectors
+    # found in the loaded image
+    entry_points = [my_address]
+
+    def read_word(address) :
+        pos = address-my_address
+        if (
+            (pos >= 0) &
+            (pos+1 < len(buffer))
+        ) : return buffer[pos]+(buffer[pos+1] << 8)
+        return None
+
+    for vector in (0xfffa, 0xfffc, 0xfffe) :    #nmi, reset, irq
+        entry = read_word(vector)
+        if (entry is not None) : entry_points.append(entry)
+
+    if (
+        (my_address == 0x8000) &
+        (bytes(buffer[4:9]) == b'\xc3\xc2\xcd80')  #CBM80
+    ) :
+        entry_points.append(read_word(0x8000))    #cold start
+        entry_points.append(read_word(0x8002))    #warm start
+
+    return entry_points
+
+
+
+def _create_trace_decode_table (
+    code,
+    opcode,
+    mode
+) :
+    # per opcode byte: (name, mode, length, cycles) for the tracer,
+    # relative branches keep their own mode 11 with length 2
+    decode_table = []
+    for my_opcode_number, my_mode, my_cycles, _ in code :
+        my_length = mode[my_mode]['length']
+        if (my_mode == 11) : my_length = 2
+        decode_table.append((
+            opcode[my_opcode_number]['name'],
+            opcode[my_opcode_number]['type'],
+            my_mode,
+            my_length,
+            my_cycles
+        ))
+    return tuple(decode_table)
+
+
+TRACE_DECODE = _create_trace_decode_table(CODE, OPCODE, MODE)
+
+
+
+def _trace_start(
+    buffer,
+    my_address
+) :
+    # a BASIC line "SYS 2061" at $0801 starts the program at 2061
+    if (
+        (my_address == 0x0801) &
+        (len(buffer) > 5)
+    ) :
+        line = bytes(buffer[4:0x50]).split(b'\0', 1)[0]
+        sys_pos = line.find(b'\x9e')   #SYS token
+        if (sys_pos >= 0) :
+            digits = line[sys_pos+1:].lstrip(b' (')
+            length = 0
+            while ((length < len(digits)) and (digits[length:length+1].isdigit())) : length += 1
+            if ((length > 0) and (int(digits[:length]) <= 0xffff)) : return int(digits[:length])
+    return my_address
+
+
+
+def _trace(
+    buffer,
+    my_address,
+    start,
+    max_cycles,
+    user_illegals,
+    coverage = None
+) :
+    """Run the program loaded at my_address from start for max_cycles cycles.
+
+    Returns the coverage bitmap, a bytearray with 1 at every address an
+    instruction was executed at (coverage, if given, is updated). BASIC and KERNAL ROM not covered by the
+    image are stubs: calls return at once, jumps to the KERNAL interrupt
+    exits end the interrupt. The raster line and the CIA timers advance
+    with the cycles, a raster interrupt runs through $0314 once per frame.
+    Execution stops at brk, kil, an illegal opcode (unless user_illegals)
+    or a return from the start.
+    """
+    mem = bytearray(0x10000)
+    end = min(my_address+len(buffer), 0x10000)
+    if (coverage is None) : coverage = bytearray(0x10000)
+    if (start > 0xffff) : return coverage
+
+    # ROM not covered by the image, TRACE_STOP ends the trace
+    rom = bytearray(0x10001)
+    rom[0xa000:0xc000] = b'\x01' * 0x2000
+    rom[0xe000:0x10001] = b'\x01' * 0x2001
+    if (end > my_address) : rom[my_address:end] = bytes(end-my_address)
+    TRACE_STOP = 0x10000
+
+    mem[0x0000] = 0x2f  #processor port
+    mem[0x0001] = 0x37
+    mem[0x0314] = 0x31  #KERNAL interrupt vectors, if not loaded with the image
+    mem[0x0315] = 0xea
+    mem[0x0318] = 0x47
+    mem[0x0319] = 0xfe
+    mem[0xdc00] = 0xff  #no key pressed, joysticks idle
+    mem[0xdc01] = 0xff
+    if (end > my_address) : mem[my_address:end] = buffer[:end-my_address]
+
+    a = x = y = 0
+    c = z = n = v = d = i = 0
+    sp = 0xfd   #return address of the start is TRACE_STOP-1
+    mem[0x01ff] = 0xff
+    mem[0x01fe] = 0xff
+    pc = start
+    cycles = 0
+
+    def push(value) :
+        nonlocal sp
+        mem[0x100+sp] = value
+        sp = (sp-1) & 0xff
+
+    def pull() :
+        nonlocal sp
+        sp = (sp+1) & 0xff
+        return mem[0x100+sp]
+
+    def status(brk) :
+        return (
+            (0x80 if n else 0) | (0x40 if v else 0) | 0x20 | brk |
+            (0x08 if d else 0) | (0x04 if i else 0) | (0x02 if z else 0) | (0x01 if c else 0)
+        )
+
+    def set_status(value) :
+        nonlocal n, v, d, i, z, c
+        n = value & 0x80
+        v = value & 0x40
+        d = value & 0x08
+        i = value & 0x04
+        z = value & 0x02
+        c = value & 0x01
+
+    def add_binary(value) :
+        nonlocal a, c, z, n, v
+        total = a+value+(1 if c else 0)
+        v = ~(a ^ value) & (a ^ total) & 0x80
+        z = (total & 0xff) == 0
+        c = total > 0xff
+        a = total & 0xff
+        n = a & 0x80
+
+    def add(value) :
+        nonlocal a, c, z, n, v
+        if (d) :
+            total = a+value+(1 if c else 0)
+            v = ~(a ^ value) & (a ^ total) & 0x80
+            z = (total & 0xff) == 0
+            low = (a & 0x0f)+(value & 0x0f)+(1 if c else 0)
+            if (low > 0x09) : low += 0x06
+            high = (a >> 4)+(value >> 4)+(low > 0x0f)
+            n = high & 0x08
+            if (high > 0x09) : high += 0x06
+            c = high > 0x0f
+            a = ((high << 4) | (low & 0x0f)) & 0xff
+        else : add_binary(value)
+
+    def subtract(value) :
+        nonlocal a
+        if (d) :
+            borrow = 0 if c else 1
+            low = (a & 0x0f)-(value & 0x0f)-borrow
+            high = (a >> 4)-(value >> 4)
+            if (low & 0x10) :
+                low -= 0x06
+                high -= 1
+            if (high & 0x10) : high -= 0x06
+            result = ((high << 4) | (low & 0x0f)) & 0xff
+            add_binary(value ^ 0xff)   #flags are set as in binary mode
+            a = result
+        else : add_binary(value ^ 0xff)
+
+    def compare(register, value) :
+        nonlocal c, z, n
+        total = register-value
+        c = total >= 0
+        z = total == 0
+        n = total & 0x80
+
+    def shift_left(addr, carry_in) :
+        nonlocal a, c, z, n
+        if (addr is None) : value = a
+        else : value = mem[addr]
+        c = value & 0x80
+        value = ((value << 1) | carry_in) & 0xff
+        z = value == 0
+        n = value & 0x80
+        if (addr is None) : a = value
+        else : mem[addr] = value
+        return value
+
+    def shift_right(addr, carry_in) :
+        nonlocal a, c, z, n
+        if (addr is None) : value = a
+        else : value = mem[addr]
+        c = value & 0x01
+        value = (value >> 1) | (carry_in << 7)
+        z = value == 0
+        n = value & 0x80
+        if (addr is None) : a = value
+        else : mem[addr] = value
+        return value
+
+    def branch(condition, addr) :
+        nonlocal pc, cycles
+        if (condition) :
+            cycles += 1
+            pc = addr
+
+    def op_lda(addr) :
+        nonlocal a, z, n
+        a = mem[addr]
+        z = a == 0
+        n = a & 0x80
+
+    def op_ldx(addr) :
+        nonlocal x, z, n
+        x = mem[addr]
+        z = x == 0
+        n = x & 0x80
+
+    def op_ldy(addr) :
+        nonlocal y, z, n
+        y = mem[addr]
+        z = y == 0
+        n = y & 0x80
+
+    def op_lax(addr) :
+        nonlocal a, x, z, n
+        a = x = mem[addr]
+        z = a == 0
+        n = a & 0x80
+
+    def op_sta(addr) : mem[addr] = a
+    def op_stx(addr) : mem[addr] = x
+    def op_sty(addr) : mem[addr] = y
+    def op_sax(addr) : mem[addr] = a & x
+
+    def op_transfer(value) :
+        nonlocal z, n
+        z = value == 0
+        n = value & 0x80
+        return value
+
+    def op_tax(addr) :
+        nonlocal x
+        x = op_transfer(a)
+
+    def op_tay(addr) :
+        nonlocal y
+        y = op_transfer(a)
+
+    def op_txa(addr) :
+        nonlocal a
+        a = op_transfer(x)
+
+    def op_tya(addr) :
+        nonlocal a
+        a = op_transfer(y)
+
+    def op_tsx(addr) :
+        nonlocal x
+        x = op_transfer(sp)
+
+    def op_txs(addr) :
+        nonlocal sp
+        sp = x
+
+    def op_inx(addr) :
+        nonlocal x
+        x = op_transfer((x+1) & 0xff)
+
+    def op_iny(addr) :
+        nonlocal y
+        y = op_transfer((y+1) & 0xff)
+
+    def op_dex(addr) :
+        nonlocal x
+        x = op_transfer((x-1) & 0xff)
+
+    def op_dey(addr) :
+        nonlocal y
+        y = op_transfer((y-1) & 0xff)
+
+    def op_inc(addr) :
+        mem[addr] = op_transfer((mem[addr]+1) & 0xff)
+
+    def op_dec(addr) :
+        mem[addr] = op_transfer((mem[addr]-1) & 0xff)
+
+    def op_and(addr) :
+        nonlocal a
+        a = op_transfer(a & mem[addr])
+
+    def op_ora(addr) :
+        nonlocal a
+        a = op_transfer(a | mem[addr])
+
+    def op_eor(addr) :
+        nonlocal a
+        a = op_transfer(a ^ mem[addr])
+
+    def op_adc(addr) : add(mem[addr])
+    def op_sbc(addr) : subtract(mem[addr])
+    def op_cmp(addr) : compare(a, mem[addr])
+    def op_cpx(addr) : compare(x, mem[addr])
+    def op_cpy(addr) : compare(y, mem[addr])
+
+    def op_bit(addr) :
+        nonlocal z, n, v
+        value = mem[addr]
+        z = (a & value) == 0
+        n = value & 0x80
+        v = value & 0x40
+
+    def op_asl(addr) : shift_left(addr, 0)
+    def op_rol(addr) : shift_left(addr, 1 if c else 0)
+    def op_lsr(addr) : shift_right(addr, 0)
+    def op_ror(addr) : shift_right(addr, 1 if c else 0)
+
+    def op_slo(addr) :
+        nonlocal a
+        a = op_transfer(a | shift_left(addr, 0))
+
+    def op_rla(addr) :
+        nonlocal a
+        a = op_transfer(a & shift_left(addr, 1 if c else 0))
+
+    def op_sre(addr) :
+        nonlocal a
+        a = op_transfer(a ^ shift_right(addr, 0))
+
+    def op_rra(addr) : add(shift_right(addr, 1 if c else 0))
+
+    def op_dcp(addr) :
+        mem[addr] = (mem[addr]-1) & 0xff
+        compare(a, mem[addr])
+
+    def op_isc(addr) :
+        mem[addr] = (mem[addr]+1) & 0xff
+        subtract(mem[addr])
+
+    def op_anc(addr) :
+        nonlocal a, c
+        a = op_transfer(a & mem[addr])
+        c = n
+
+    def op_alr(addr) :
+        nonlocal a
+        a &= mem[addr]
+        shift_right(None, 0)
+
+    def op_axs(addr) :
+        nonlocal x, c
+        total = (a & x)-mem[addr]
+        c = total >= 0
+        x = op_transfer(total & 0xff)
+
+    def op_bcc(addr) : branch(not c, addr)
+    def op_bcs(addr) : branch(c, addr)
+    def op_bne(addr) : branch(not z, addr)
+    def op_beq(addr) : branch(z, addr)
+    def op_bpl(addr) : branch(not n, addr)
+    def op_bmi(addr) : branch(n, addr)
+    def op_bvc(addr) : branch(not v, addr)
+    def op_bvs(addr) : branch(v, addr)
+
+    def op_jmp(addr) :
+        nonlocal pc
+        pc = addr
+
+    def op_jsr(addr) :
+        nonlocal pc
+        push(((pc-1) & 0xffff) >> 8)
+        push((pc-1) & 0xff)
+        pc = addr
+
+    def op_rts(addr) :
+        nonlocal pc
+        low = pull()
+        pc = (low | (pull() << 8))+1    #TRACE_STOP after the return from start
+
+    def op_rti(addr) :
+        nonlocal pc
+        set_status(pull())
+        low = pull()
+        pc = low | (pull() << 8)
+
+    def op_pha(addr) : push(a)
+    def op_php(addr) : push(status(0x10))
+
+    def op_pla(addr) :
+        nonlocal a
+        a = op_transfer(pull())
+
+    def op_plp(addr) : set_status(pull())
+
+    def op_clc(addr) :
+        nonlocal c
+        c = 0
+
+    def op_sec(addr) :
+        nonlocal c
+        c = 1
+
+    def op_cli(addr) :
+        nonlocal i
+        i = 0
+
+    def op_sei(addr) :
+        nonlocal i
+        i = 1
+
+    def op_cld(addr) :
+        nonlocal d
+        d = 0
+
+    def op_sed(addr) :
+        nonlocal d
+        d = 1
+
+    def op_clv(addr) :
+        nonlocal v
+        v = 0
+
+    def op_nop(addr) : pass
+
+    handlers = locals()
+    dispatch = []
+    for name, opcode_type, my_mode, my_length, my_cycles in TRACE_DECODE :
+        handler = handlers.get('op_'+name)
+        if (
+            (opcode_type == 4) and
+            (user_illegals == False)
+        ) :
+            handler = None  #illegal opcodes are taken as data, as in the disassembly
+        dispatch.append((handler, my_mode, my_length, my_cycles))
+
+    next_line = TRACE_LINE_CYCLES
+    next_irq = TRACE_FRAME_CYCLES
+    while (cycles < max_cycles) :
+        if (cycles >= next_line) :
+            # raster line and CIA timers advance, raster interrupt once per frame
+            line = (cycles // TRACE_LINE_CYCLES) % TRACE_LINES
+            mem[0xd012] = line & 0xff
+            mem[0xd011] = (mem[0xd011] & 0x7f) | ((line >> 1) & 0x80)
+            mem[0xdc04] = mem[0xdd04] = cycles & 0xff
+            mem[0xdc05] = mem[0xdd05] = (cycles >> 8) & 0xff
+            next_line = cycles-cycles % TRACE_LINE_CYCLES+TRACE_LINE_CYCLES
+            if (cycles >= next_irq) :
+                next_irq = cycles-cycles % TRACE_FRAME_CYCLES+TRACE_FRAME_CYCLES
+                if (i == 0) :
+                    push(pc >> 8)
+                    push(pc & 0xff)
+                    push(status(0))
+                    i = 1
+                    cycles += 7
+                    if (
+                        (rom[0xfffe] == 0) and
+                        ((mem[0x0001] & 0x02) == 0)
+                    ) :
+                        pc = mem[0xfffe] | (mem[0xffff] << 8)  #KERNAL banked out
+                    else :
+                        push(a)
+                        push(x)
+                        push(y)
+                        pc = mem[0x0314] | (mem[0x0315] << 8)
+
+        if (rom[pc]) :
+            if (pc == TRACE_STOP) : break
+            if (pc in KERNAL_IRQ_EXITS) :
+                y = pull()
+                x = pull()
+                a = pull()
+                op_rti(None)
+            else :
+                op_rts(None)    #KERNAL and BASIC calls return at once, without error
+                c = 0
+            cycles += 6
+            continue
+
+        handler, my_mode, my_length, my_cycles = dispatch[mem[pc]]
+        if (handler is None) : break    #kil or illegal opcode
+        coverage[pc] = 1
+
+        operand = (pc+1) & 0xffff
+        if (my_mode == 7) : addr = mem[operand] | (mem[(operand+1) & 0xffff] << 8)
+        elif (my_mode == 1) : addr = operand
+        elif (my_mode == 2) : addr = mem[operand]
+        elif (my_mode == 0) : addr = None
+        elif (my_mode == 11) : addr = (pc+2+mem[operand]-((mem[operand] & 0x80) << 1)) & 0xffff
+        elif (my_mode == 8) : addr = ((mem[operand] | (mem[(operand+1) & 0xffff] << 8))+x) & 0xffff
+        elif (my_mode == 9) : addr = ((mem[operand] | (mem[(operand+1) & 0xffff] << 8))+y) & 0xffff
+        elif (my_mode == 6) :
+            pointer = mem[operand]
+            addr = ((mem[pointer] | (mem[(pointer+1) & 0xff] << 8))+y) & 0xffff
+        elif (my_mode == 3) : addr = (mem[operand]+x) & 0xff
+        elif (my_mode == 4) : addr = (mem[operand]+y) & 0xff
+        elif (my_mode == 5) :
+            pointer = (mem[operand]+x) & 0xff
+            addr = mem[pointer] | (mem[(pointer+1) & 0xff] << 8)
+        else :  #ind, with the page wrap of the 6502
+            pointer = mem[operand] | (mem[(operand+1) & 0xffff] << 8)
+            addr = mem[pointer] | (mem[(pointer & 0xff00) | ((pointer+1) & 0xff)] << 8)
+
+        pc = (pc+my_length) & 0xffff
+        cycles += my_cycles
+        handler(addr)
+
+    return coverage
+
+
+
+def _trace_entry_points(
+    buffer,
+    my_address,
+    entries,
+    max_cycles,
+    user_illegals,
+    log = print
+) :
+    # addresses executed by the tracer inside the image, used as entry points of the flow-following disassembly;
+    # the program is run from its start and from every additional entry point
+    coverage = bytearray(0x10000)
+    for start in [_trace_start(buffer, my_address)] + list(entries) :
+        log('    Tracing %d cycles from $%04x...' % (max_cycles, start))
+        _trace(buffer, my_address, start, max_cycles, user_illegals, coverage)
+    end = min(my_address+len(buffer), 0x10000)
+    return [address for address in range(my_address, end) if coverage[address]]
+
+
+
+def _create_instruction_starts (
+    disassembly
+) :
+    # set of all addresses an instruction starts at
+    return set(disassembly.pos)
+
+
+
+
+
+def _create_xref_index (
+    disassembly
+) :
+    # target address -> array of indexes of all instructions referencing it,
+    # the kind of reference is the opcode type of the instruction
+    xref_index = {}
+    index = 0
+    for target_address, flags in zip(disassembly.target_address, disassembly.flags) :
+        if (flags & FLAG_LABEL_POSSIBLE) :
+            references = xref_index.get(target_address)
+            if (references is None) :
+                references = array.array('L')
+                xref_index[target_address] = references
+            references.append(index)
+        index += 1
+    return xref_index
+
+
+
+
+
+def _read_label_file (
+    filename_labels,
+    rebuild = False,
+    log = print
+) :
+    # the compiled label database (labels and lookup table) is cached in
+    # _cache_dir(), keyed by path, and rebuilt whenever mtime/size and
+    # content hash of the json-file no longer match
+	#open labels file
+    log ("    Opening labels-file \"%s\" for reading..." % filename_labels)
+    try:
+        file_stat = os.stat(filename_labels)
+    except OSError as err:
+        raise DissectorError("I/O error: {0}".format(err))
+
+    cache_file = os.path.join(
+        _cache_dir(),
+        'labels-%s.pickle' % hashlib.sha1(os.path.abspath(filename_labels).encode('utf-8')).hexdigest()
+    )
+
+    cached = None
+    if (rebuild == False) :
+        cached = _read_label_cache(cache_file)
+        if (
+            (cached is not None) and
+            (cached['mtime'] == file_stat.st_mtime_ns) and
+            (cached['size'] == file_stat.st_size)
+        ) : return cached['label_db']
+
+    try:
+        file_labels = open(filename_labels , "rb")
+    except IOError as err:
+        raise DissectorError("I/O error: {0}".format(err))
+    content = file_labels.read()
+    file_labels.close()
+    digest = hashlib.sha1(content).hexdigest()
+
+    if (
+        (cached is not None) and
+        (cached['label_db']['hash'] == digest)
+    ) :
+        label_db = cached['label_db']   #touched, but unchanged
+    else :
+        log ("    Compiling labels-file \"%s\"..." % filename_labels)
+        try:
+            user_labels = json.loads(content)
+        except ValueError as err:
+            raise DissectorError("error: labels-file {0}".format(err))
+        label_db = {
+            'labels' : user_labels,
+            'table' : _create_label_table(user_labels),
+            'hash' : digest
+        }
+
+    _write_label_cache(
+        cache_file,
+        log,
+        {
+            'version' : LABEL_CACHE_VERSION,
+            'mtime' : file_stat.st_mtime_ns,
+            'size' : file_stat.st_size,
+            'label_db' : label_db
+        }
+    )
+
+    return label_db
+
+
+
+def _cache_dir() :
+    cache_home = os.environ.get('XDG_CACHE_HOME')
+    if not cache_home : cache_home = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, PROGNAME)
+
+
+
+def _read_label_cache (
+    cache_file
+) :
+    try:
+        with open(cache_file, 'rb') as file_cache :
+            cached = pickle.load(file_cache)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) :
+        return None
+    if (
+        (not isinstance(cached, dict)) or
+        (cached.get('version') != LABEL_CACHE_VERSION)
+    ) : return None
+    return cached
+
+
+
+def _write_label_cache (
+    cache_file,
+    log,
+    cached
+) :
+    # the cache is only an accelerator, failing to write it is not an error
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = '%s.%d.tmp' % (cache_file, os.getpid())
+        with open(tmp_file, 'wb') as file_cache :
+            pickle.dump(cached, file_cache, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError as err:
+        log("    Label cache not written: {0}".format(err))
+    return None
+
+
+
+def _create_label_table (
+    user_labels
+) :
+    # address -> index of the first label definition whose from/to range
+    # contains that address, len(user_labels) if there is none
+    table_size = 0x10000
+    for this_def in user_labels :
+        if (this_def['to']+1 > table_size) : table_size = this_def['to']+1
+
+    if (len(user_labels) < 0xffff) : typecode = 'H'
+    else : typecode = 'L'
+    table = array.array(typecode, [len(user_labels)]) * table_size
+
+    # fill in reverse order, so the first matching definition wins
+    for index in range(len(user_labels)-1, -1, -1) :
+        this_def = user_labels[index]
+        if (this_def['to'] < this_def['from']) : continue
+        table[this_def['from']:this_def['to']+1] = array.array(typecode, [index]) * (this_def['to']-this_def['from']+1)
+
+    return table
+
+
+
+def _create_labels (
+    disassembly,
+    instruction_starts,
+    label_db,
+    my_address,
+    my_limit,
+    log = print
+):
+    resolved = _resolve_label_targets(
+        disassembly.target_address,
+        disassembly.flags,
+        label_db['table'],
+        len(label_db['labels']),
+        my_address,
+        my_address+my_limit-1
+    )
+    return _number_labels(resolved, instruction_starts, label_db, my_address, my_limit, log)
+
+
+
+def _create_labels_parallel (
+    disassembly,
+    instruction_starts,
+    label_db,
+    my_address,
+    my_limit,
+    executor,
+    jobs,
+    log = print
+):
+    # resolve the targets of jobs chunks of instructions in the worker processes,
+    # then number the labels in program order like _create_labels
+    chunk_size = max(-(-len(disassembly) // jobs), 1)
+    bounds = [(start, start+chunk_size) for start in range(0, len(disassembly), chunk_size)]
+    chunks = executor.map(
+        _resolve_label_chunk,
+        [disassembly.target_address[start:end] for start, end in bounds],
+        [disassembly.flags[start:end] for start, end in bounds],
+        [len(label_db['labels'])]*len(bounds),
+        [my_address]*len(bounds),
+        [my_address+my_limit-1]*len(bounds)
+    )
+
+    resolved = []
+    known_addresses = set()
+    for chunk in chunks :
+        for target_address, index in chunk :
+            if (target_address in known_addresses) : continue   #already found in an earlier chunk
+            known_addresses.add(target_address)
+            resolved.append((target_address, index))
+    return _number_labels(resolved, instruction_starts, label_db, my_address, my_limit, log)
+
+
+
+def _resolve_label_chunk (
+    target_addresses,
+    flags,
+    labels_count,
+    code_from,
+    code_to
+) :
+    return _resolve_label_targets(target_addresses, flags, _parallel_label_table, labels_count, code_from, code_to)
+
+
+
+def _resolve_label_targets (
+    target_addresses,
+    flags,
+    table,
+    labels_count,
+    code_from,
+    code_to
+) :
+    # (target address, index of the label definition) of every target that gets a label,
+    # in program order and without duplicates; index is labels_count for the user program area
+    resolved = []
+    known_addresses = set()
+    table_size = len(table)
+    for target_address, my_flags in zip(target_addresses, flags) :
+        if ((my_flags & FLAG_LABEL_POSSIBLE) == 0) : continue
+        if (target_address in known_addresses) : continue   #duplicate
+        index = labels_count
+        if (
+            (target_address >= 0) &
+            (target_address < table_size)
+        ) :
+            index = table[target_address]
+        if (
+            (index == labels_count) &
+            ((target_address < code_from) | (target_address > code_to))
+        ) :
+            continue
+        known_addresses.add(target_address)
+        resolved.append((target_address, index))
+    return resolved
+
+
+
+def _number_labels (
+    resolved,
+    instruction_starts,
+    label_db,
+    my_address,
+    my_limit,
+    log = print
+):
+    global MAX_LABEL_TYPES
+
+    # user program area, checked after all entries of the label-file
+    tmp_code = {
+        "from": my_address,
+        "to": my_address+my_limit-1,
+        "type": "",
+        "area": "code",
+        "area_type": 0,
+        "short": "",
+        "comment": "user program"
+    }
+
+    user_labels = label_db['labels']
+    my_label = []
+    label_counter = [0] * MAX_LABEL_TYPES
+    for target_address, index in resolved :
+        if (index < len(user_labels)) : this_def = user_labels[index]
+        else : this_def = tmp_code
+
+        label_name = str(this_def['area']) + '_'
+        if (this_def['short'] != '') :
+            label_name = label_name + str(this_def['short']) + '_'
+        label_name = label_name + str(label_counter[this_def['area_type']]).zfill(3)
+
+        #do we find it in memory address or do we have to add +1 or +2 ?
+        add_me = 0
+        if (this_def['area'] == 'code') :    # only internal labels
+            if (target_address in instruction_starts) : add_me = 0
+            elif (target_address-1 in instruction_starts) : add_me = 1
+            elif (target_address-2 in instruction_starts) : add_me = 2
+            else :
+                #this should never happen
+                log('Address $%04x for label \"%s\" cannot be found.' %( target_address,label_name) )
+
+        my_label.append({
+            'name':label_name,
+            'address':target_address,
+            'type':this_def['area_type'],
+            'add': add_me,
+            'comment': this_def['comment']
+        })
+        label_counter[this_def['area_type']] +=1 #increase number of label
+
+    return my_label
+
+
+
+
+
+def _create_label_index (
+    labels
+) :
+    # address-keyed lookup tables for labels:
+    #   'address'    : target address -> label
+    #   'definition' : address the label is defined at (address-add) -> list of labels
+    by_address = {}
+    by_definition = {}
+    for my_label in labels :
+        by_address[my_label['address']] = my_label
+        by_definition.setdefault(my_label['address']-my_label['add'], []).append(my_label)
+
+    return {
+        'address' : by_address,
+        'definition' : by_definition
+    }
+
+
+
+
+
+def _no_log(
+    message
+) :
+    return None
+
+
+
+def disassemble(
+    data,
+    address,
+    options = None,
+    output = None
+) :
+    """Disassemble data loaded at address and return the results as a dict.
+
+    data is an input filename, "-" for stdin or a bytes-like buffer.
+    options overrides entries of DEFAULT_OPTIONS. The source code is
+    streamed to the file-like object output or, if output is None,
+    returned as result['source']. Errors raise DissectorError.
+    """
+    context = dict(DEFAULT_OPTIONS)
+    if (options is not None) :
+        for key in options :
+            if (key not in DEFAULT_OPTIONS) : raise DissectorError("error: unknown option \"%s\"" % key)
+        context.update(options)
+    if (context['asmtype'] not in ASSEMBLERS) :
+        raise DissectorError("error: unknown assembler-type \"%s\"" % context['asmtype'])
+    if (
+        (context['dumpchars'] is not None) and
+        (context['dumpchars'] not in DUMP_CHARS)
+    ) :
+        raise DissectorError("error: unknown character set \"%s\"" % context['dumpchars'])
+    log = context['log']
+    if (log is None) : log = _no_log
+    filename = context['filename']
+    if (filename is None) :
+        if (isinstance(data, str)) : filename = data
+        else : filename = '<memory>'
+
+    stats = context['stats']
+    if (stats is not None) :
+        stats['stages'] = {}
+        stats['counters'] = {}
+
+    if (output is None) : file_out = io.StringIO()
+    else : file_out = output
+    string_out = file_out
+    counting_out = None
+    if (stats is not None) :
+        counting_out = _CountingOutput(file_out)
+        file_out = counting_out
+
+    _run_stage (
+        context,
+        'write_header',
+        _write_header,
+        file_out,
+        context['asmtype'],
+        PROGNAME,
+        VERSION,
+        DATUM,
+        filename,
+        address,
+        context['offset'],
+        context['limit']
+    )    
+    file_out.flush()
+
+    buffer = _run_stage( context, 'read_file', _read_file, data, context['offset'], context['limit'], log )
+
+    label_db = context['label_db']
+    if (label_db is None) : label_db = _run_stage ( context, 'read_label_file', _read_label_file, context['label_file'], context['rebuild_label_cache'], log )
+
+    tee_out = None
+    if (context['cache'] == True) :
+        cache_key = _result_cache_key(buffer, address, context, label_db)
+        cached = _run_stage(context, 'read_result_cache', _read_result_cache, cache_key, file_out)
+        if (cached is not None) :
+            log('    Using cached result...')
+            cached['address'] = address
+            cached['buffer'] = buffer
+            if (output is None) : cached['source'] = string_out.getvalue()
+            else : cached['source'] = None
+            _finish_stats(stats, cached, counting_out, True)
+            return cached
+
+    # large images are decoded and labelled in chunks by worker processes
+    executor = None
+    if (
+        (context['jobs'] > 1) and
+        (context['flow'] == False) and
+        (context['trace'] == 0) and
+        (len(buffer) >= PARALLEL_THRESHOLD)
+    ) :
+        import concurrent.futures
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=context['jobs'],
+            initializer=_parallel_init,
+            initargs=(label_db['table'],)
+        )
+
+    try:
+        # a session keeps decoded instructions and labels of the last run,
+        # only the stages whose inputs changed are run again
+        session = None
+        decode_key = None
+        if (context['session'] is not None) :
+            session = _run_stage(context, 'read_session', _read_session, context['session'])
+            decode_key = _session_decode_key(buffer, address, context)
+            label_key = (label_db['hash'], address, context['limit'])
+
+        if (
+            (session is not None) and
+            (session['decode_key'] == decode_key)
+        ) :
+            log('    Using decoded instructions of session...')
+            disassembly = session['disassembly']
+            instruction_starts = session['instruction_starts']
+            xref_index = session['xref_index']
+        else :
+            session = None
+            if (
+                (context['flow'] == True) or
+                (context['trace'] > 0)
+            ) :
+                entry_points = _find_entry_points(buffer, address) + list(context['entries'])
+                if (context['trace'] > 0) :
+                    entry_points += _run_stage(
+                        context,
+                        'trace',
+                        _trace_entry_points,
+                        buffer,
+                        address,
+                        context['entries'],
+                        context['trace'],
+                        context['illegals'],
+                        log
+                    )
+                disassembly = _run_stage(
+                    context,
+                    'create_disassembly',
+                    _create_disassembly_flow,
+                    buffer,
+                    address,
+                    entry_points,
+                    context['illegals']
+                )
+            elif (
+                (executor is not None) and
+                (_import_numpy() is None)   #numpy decodes in one process faster than the workers in pure Python
+            ) : disassembly = _run_stage( context, 'create_disassembly', _create_disassembly_parallel, buffer, address, executor, context['jobs'] )
+            else : disassembly = _run_stage( context, 'create_disassembly', _create_disassembly, buffer, address )
+
+            instruction_starts = _run_stage ( context, 'create_instruction_starts', _create_instruction_starts, disassembly )
+
+            xref_index = _run_stage ( context, 'create_xref_index', _create_xref_index, disassembly )
+
+        if (
+            (session is not None) and
+            (session['label_key'] == label_key)
+        ) :
+            log('    Using labels of session...')
+            labels = session['labels']
+            label_index = session['label_index']
+        else :
+            if (executor is not None) : labels = _run_stage ( context, 'create_labels', _create_labels_parallel, disassembly, instruction_starts, label_db, address, context['limit'], executor, context['jobs'], log )
+            else : labels = _run_stage ( context, 'create_labels', _create_labels, disassembly, instruction_starts, label_db, address, context['limit'], log )
+
+            label_index = _run_stage ( context, 'create_label_index', _create_label_index, labels )
+
+            if (context['session'] is not None) :
+                _run_stage(
+                    context,
+                    'write_session',
+                    _write_session,
+                    context['session'],
+                    {
+                        'version' : SESSION_VERSION,
+                        'decode_key' : decode_key,
+                        'label_key' : label_key,
+                        'disassembly' : disassembly,
+                        'instruction_starts' : instruction_starts,
+                        'xref_index' : xref_index,
+                        'labels' : labels,
+                        'label_index' : label_index
+                    }
+                )
+    finally:
+        if (executor is not None) : executor.shutdown()
+
+    if (context['cache'] == True) :
+        file_cache = _open_result_cache(cache_key)
+        if (file_cache is not None) :
+            tee_out = _TeeOutput(file_out, file_cache)
+            file_out = tee_out
+
+    try:
+        if (context['memorydump'] == True) : _run_stage ( context, 'write_memory_dump', _write_memory_dump, file_out, buffer, address, context['dumpchars'] )
+
+        if (context['illegals'] == True) : log('    Using illegal opcodes...')
+
+        _run_stage(
+            context,
+            'write_disassembly',
+            _write_disassembly,
+            file_out,
+            disassembly, 
+            address,
+            context['asmtype'],
+            context['cycles'],
+            context['illegals'],
+            label_index,
+            xref_index if context['xref'] else None,
+            context['cancel']
+        )
+
+        if (context['labellist'] == True) : _run_stage ( context, 'write_labels', _write_labels, file_out, context['asmtype'], labels )
+
+        if (context['xref'] == True) : _run_stage ( context, 'write_xrefs', _write_xrefs, file_out, context['asmtype'], disassembly, xref_index, label_index )
+    except BaseException :
+        # cancelled or failed, do not leave a partial cache file behind
+        if (tee_out is not None) :
+            tee_out.file_copy.close()
+            os.remove(tee_out.file_copy.name)
+        raise
+
+    result = {
+        'address' : address,
+        'buffer' : buffer,
+        'disassembly' : disassembly,
+        'instruction_starts' : instruction_starts,
+        'labels' : labels,
+        'label_index' : label_index,
+        'xref_index' : xref_index,
+        'source' : None
+    }
+
+    if (tee_out is not None) :
+        _run_stage(context, 'write_result_cache', _write_result_cache, cache_key, tee_out.file_copy, result, context['cache_size'], log)
+
+    if (output is None) : result['source'] = string_out.getvalue()
+
+    _finish_stats(stats, result, counting_out, False)
+
+    return result
+
+
+
+def _run_stage(
+    context,
+    name,
+    function,
+    *arguments
+) :
+    # call function, reporting the stage to context['progress'] and recording
+    # wall time in context['stats'], if these are not None. tracemalloc makes
+    # every allocation several times slower, so the peak memory is only
+    # traced with context['stats_memory']
+    if (context['progress'] is not None) : context['progress'](name)
+    stats = context['stats']
+    if (stats is None) : return function(*arguments)
+
+    if (context['stats_memory'] == False) :
+        time_start = time.perf_counter()
+        try:
+            return function(*arguments)
+        finally:
+            stats['stages'][name] = {
+                'seconds' : time.perf_counter()-time_start
+            }
+
+    import tracemalloc
+    tracing = tracemalloc.is_tracing()
+    if (tracing == False) : tracemalloc.start()
+    tracemalloc.reset_peak()
+    memory_start = tracemalloc.get_traced_memory()[0]
+    time_start = time.perf_counter()
+    try:
+        return function(*arguments)
+    finally:
+        seconds = time.perf_counter()-time_start
+        peak = tracemalloc.get_traced_memory()[1]-memory_start
+        if (tracing == False) : tracemalloc.stop()
+        stats['stages'][name] = {
+            'seconds' : seconds,
+            'peak_memory' : peak
+        }
+
+
+
+def _finish_stats(
+    stats,
+    result,
+    counting_out,
+    cache_hit
+) :
+    if (stats is None) : return None
+    label_lookups = 0
+    for flags in result['disassembly'].flags :
+        if (flags & FLAG_LABEL_POSSIBLE) : label_lookups += 1
+    stats['counters'] = {
+        'bytes_read' : len(result['buffer']),
+        'instructions' : len(result['disassembly']),
+        'label_lookups' : label_lookups,
+        'labels' : len(result['labels']),
+        'lines_written' : counting_out.lines,
+        'bytes_written' : counting_out.bytes,
+        'cache_hit' : cache_hit
+    }
+    return None
+
+
+
+class _CountingOutput :
+    # counts lines and bytes written to the output
+
+    def __init__(self, file_out) :
+        self.file_out = file_out
+        self.lines = 0
+        self.bytes = 0
+
+    def write(self, text) :
+        self.lines += text.count('\n')
+        self.bytes += len(text)
+        self.file_out.write(text)
+
+    def flush(self) :
+        self.file_out.flush()
+
+
+
+def _session_decode_key(
+    buffer,
+    address,
+    context
+) :
+    # everything the decoded instructions depend on
+    digest = hashlib.sha256()
+    digest.update(repr((
+        _program_hash(),
+        address,
+        context['offset'],
+        context['limit'],
+        context['flow'],
+        sorted(context['entries']),
+        context['trace'],
+        (context['flow'] or context['trace'] > 0) and context['illegals']    #illegals only change the flow-following decoder
+    )).encode('utf-8'))
+    digest.update(buffer)
+    return digest.hexdigest()
+
+
+
+def _read_session(
+    filename_session
+) :
+    # a missing or unreadable session file just means starting from scratch
+    try:
+        with open(filename_session, 'rb') as file_session :
+            session = pickle.load(file_session)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) :
+        return None
+    if (
+        (not isinstance(session, dict)) or
+        (session.get('version') != SESSION_VERSION)
+    ) : return None
+    return session
+
+
+
+def _write_session(
+    filename_session,
+    session
+) :
+    try:
+        tmp_file = '%s.%d.tmp' % (filename_session, os.getpid())
+        with open(tmp_file, 'wb') as file_session :
+            pickle.dump(session, file_session, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, filename_session)
+    except OSError as err:
+        raise DissectorError("I/O error: {0}".format(err))
+    return None
+
+
+
+class _TeeOutput :
+    # writes to the output and to the result cache file at the same time
+
+    def __init__(self, file_out, file_copy) :
+        self.file_out = file_out
+        self.file_copy = file_copy
+
+    def write(self, text) :
+        self.file_out.write(text)
+        self.file_copy.write(text)
+
+    def flush(self) :
+        self.file_out.flush()
+
+
+
+def _result_cache_dir() :
+    return os.path.join(_cache_dir(), 'results')
+
+
+
+def _result_cache_key(
+    buffer,
+    address,
+    context,
+    label_db
+) :
+    # everything that changes the output except the header
+    digest = hashlib.sha256()
+    digest.update(repr((
+        RESULT_CACHE_VERSION,
+        _program_hash(),
+        address,
+        context['offset'],
+        context['limit'],
+        label_db['hash'],
+        context['asmtype'],
+        context['memorydump'],
+        context['dumpchars'],
+        context['illegals'],
+        context['labellist'],
+        context['cycles'],
+        context['xref'],
+        context['flow'],
+        sorted(context['entries']),
+        context['trace']
+    )).encode('utf-8'))
+    digest.update(buffer)
+    return digest.hexdigest()
+
+
+
+_program_hash_value = None
+
+def _program_hash() :
+    # results of an older dissector.py must not be reused, the
+    # program is only read and hashed once per process
+    global _program_hash_value
+    if (_program_hash_value is None) :
+        try:
+            with open(__file__, 'rb') as file_program :
+                _program_hash_value = hashlib.sha1(file_program.read()).hexdigest()
+        except (OSError, NameError) :
+            _program_hash_value = VERSION
+    return _program_hash_value
+
+
+
+def _read_result_cache(
+    cache_key,
+    file_out
+) :
+    # copy the cached source to file_out and return the cached results, None if not cached
+    filename_cache = os.path.join(_result_cache_dir(), cache_key)
+    try:
+        with open(filename_cache+'.pickle', 'rb') as file_cache :
+            cached = pickle.load(file_cache)
+        import shutil
+        with open(filename_cache+'.a', 'r') as file_cache :
+            shutil.copyfileobj(file_cache, file_out)
+        os.utime(filename_cache+'.pickle')   #most recently used
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) :
+        return None
+    return cached
+
+
+
+def _open_result_cache(
+    cache_key
+) :
+    try:
+        os.makedirs(_result_cache_dir(), exist_ok=True)
+        return open(os.path.join(_result_cache_dir(), '%s.a.%d-%d.tmp' % (cache_key, os.getpid(), threading.get_ident())), 'w')
+    except OSError :
+        return None
+
+
+
+def _write_result_cache(
+    cache_key,
+    file_cache,
+    result,
+    cache_size,
+    log
+) :
+    # the cache is only an accelerator, failing to write it is not an error
+    filename_cache = os.path.join(_result_cache_dir(), cache_key)
+    try:
+        file_cache.close()
+        os.replace(file_cache.name, filename_cache+'.a')
+        tmp_file = '%s.%d-%d.tmp' % (filename_cache, os.getpid(), threading.get_ident())
+        with open(tmp_file, 'wb') as file_pickle :
+            pickle.dump(
+                {
+                    'disassembly' : result['disassembly'],
+                    'instruction_starts' : result['instruction_starts'],
+                    'labels' : result['labels'],
+                    'label_index' : result['label_index'],
+                    'xref_index' : result['xref_index']
+                },
+                file_pickle,
+                pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(tmp_file, filename_cache+'.pickle')
+        _evict_result_cache(cache_size)
+    except OSError as err:
+        log("    Result cache not written: {0}".format(err))
+    return None
+
+
+
+def _evict_result_cache(
+    cache_size
+) :
+    # remove least recently used results until the cache fits into cache_size bytes.
+    # Temporary files of runs in progress count, those of killed runs are removed
+    entries = {}
+    total = 0
+    for filename in os.listdir(_result_cache_dir()) :
+        cache_key, extension = os.path.splitext(filename)
+        if (extension not in ('.a', '.pickle', '.tmp')) : continue
+        try:
+            file_stat = os.stat(os.path.join(_result_cache_dir(), filename))
+            if (extension == '.tmp') :
+                if (time.time()-file_stat.st_mtime > RESULT_CACHE_STALE_SECONDS) : os.remove(os.path.join(_result_cache_dir(), filename))
+                else : total += file_stat.st_size
+                continue
+        except OSError :
+            continue
+        size, used = entries.get(cache_key, (0, 0))
+        if (extension == '.pickle') : used = file_stat.st_mtime
+        entries[cache_key] = (size+file_stat.st_size, used)
+
+    for size, used in entries.values() : total += size
+    for cache_key in sorted(entries, key=lambda cache_key : entries[cache_key][1]) :
+        if (total <= cache_size) : break
+        for extension in ('.pickle', '.a') :
+            try:
+                os.remove(os.path.join(_result_cache_dir(), cache_key+extension))
+            except OSError :
+                pass
+        total -= entries[cache_key][0]
+    return None
+
+
+
+def _options_from_args(
+    parser,
+    args,
+    unsupported = ()
+) :
+    # the options for disassemble() given on the command line. unsupported
+    # lists (dest, flag) pairs of the arguments not allowed in this mode
+    for dest, flag in unsupported :
+        if (getattr(args, dest) != parser.get_default(dest)) : parser.error('%s is not supported in this mode' % flag)
+
+    try:
+        my_offset = int (args.offset, 16)	#convert from hex string
+    except ValueError as err:
+        print("error: offset {0}".format(err))
+        sys.exit(1)
+        
+    try:
+        my_limit = int (args.limit, 16)	#convert from hex string
+    except ValueError as err:
+        print("error: limit {0}".format(err))
+        sys.exit(1)
+
+    my_entries = []
+    for entry in args.entries :
+        try:
+            my_entries.append(int (entry, 16))	#convert from hex string
+        except ValueError as err:
+            print("error: entry {0}".format(err))
+            sys.exit(1)
+
+    return {
+        'offset' : my_offset,
+        'limit' : my_limit,
+        'label_file' : args.label_file,
+        'rebuild_label_cache' : args.rebuild_label_cache,
+        'asmtype' : args.asmtype,
+        'memorydump' : args.memorydump,
+        'dumpchars' : args.dumpchars,
+        'illegals' : args.illegals,
+        'labellist' : args.labellist,
+        'cycles' : args.cycles,
+        'xref' : args.xref,
+        'flow' : args.flow,
+        'entries' : my_entries,
+        'trace' : args.trace,
+        'cache' : not args.no_cache,
+        'cache_size' : args.cache_size*0x100000,
+        'jobs' : args.jobs or 1,
+        'session' : args.session,
+        'stats_memory' : args.stats_memory
+    }
+
+
+
+def _do_it(
+        parser,
+        args
+    ) :
+
+# sanity checks        
+    try:
+        my_address = int (args.startaddress, 16)	#convert from hex string
+    except ValueError as err:
+        print("error: address {0}".format(err))
+        sys.exit(1)
+
+    options = _options_from_args(parser, args)
+
+
+    # when the disassembly goes to stdout, all messages go to stderr
+    if ('-' in (args.output_file, args.jsonl_file)) : log = _log_stderr
+    else : log = print
+
+    stats = None
+    if (
+        (args.stats == True) |
+        (args.stats_memory == True) |
+        (args.stats_json is not None)
+    ) : stats = {}
+    options['stats'] = stats
+    options['log'] = log
+    stage_context = {
+        'stats' : stats,
+        'stats_memory' : args.stats_memory,
+        'progress' : None
+    }
+
+    profiler = None
+    if (args.profile is not None) :
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        result = disassemble_to_file(
+            args.input_file,
+            my_address,
+            args.output_file,
+            options
+        )
+
+        if (args.jsonl_file is not None) :
+            with _replace_file(args.jsonl_file, False, log) as file_jsonl :
+                _run_stage( stage_context, 'write_jsonl', _write_jsonl, file_jsonl, result['disassembly'], result['label_index'] )
+
+        if (args.columns_file is not None) :
+            with _replace_file(args.columns_file, True, log) as file_columns :
+                _run_stage( stage_context, 'write_columns', _write_columns, file_columns, result['disassembly'] )
+    except DissectorError as err:
+        log(err)
+        sys.exit(1)
+
+    if (profiler is not None) :
+        profiler.disable()
+        try:
+            profiler.dump_stats(args.profile)
+        except OSError as err:
+            log("I/O error: {0}".format(err))
+            sys.exit(1)
+
+    if (
+        (args.stats == True) |
+        (args.stats_memory == True)
+    ) : _print_stats(stats)
+    if (args.stats_json is not None) :
+        try:
+            with open(args.stats_json, 'w') as file_stats :
+                json.dump(stats, file_stats, indent=2)
+        except IOError as err:
+            log("I/O error: {0}".format(err))
+            sys.exit(1)
+
+    log ("done.")
+    
+    
+    
+    return None
+
+
+
+def _read_batch_manifest(
+    filename_manifest,
+    my_offset,
+    my_limit
+) :
+    # the manifest is a json list of entries like
+    #   {"input_file": "dumps/*.prg", "startaddress": "0801", "offset": "2"}
+    # input_file may be a glob pattern, output_file defaults to input_file
+    # with extension ".a", offset and limit default to the command line values
+    try:
+        with open(filename_manifest, 'r') as file_manifest :
+            manifest = json.load(file_manifest)
+    except IOError as err:
+        raise DissectorError("I/O error: {0}".format(err))
+    except ValueError as err:
+        raise DissectorError("error: manifest {0}".format(err))
+
+    if (not isinstance(manifest, list)) : raise DissectorError("error: manifest has to be a list of entries")
+
+    import glob
+    jobs = []
+    for entry in manifest :
+        try:
+            filenames_in = sorted(glob.glob(entry['input_file']))
+            my_address = _parse_hex(entry['startaddress'])
+            job_offset = _parse_hex(entry.get('offset', my_offset))
+            job_limit = _parse_hex(entry.get('limit', my_limit))
+        except (KeyError, TypeError, ValueError) as err:
+            raise DissectorError("error: manifest entry {0}: {1}".format(entry, err))
+
+        # nothing found: keep the entry, it is reported as failed job
+        if (len(filenames_in) == 0) : filenames_in = [entry['input_file']]
+        if (
+            ('output_file' in entry) &
+            (len(filenames_in) > 1)
+        ) :
+            raise DissectorError("error: manifest entry {0}: output_file given for several input files".format(entry))
+
+        for filename_in in filenames_in :
+            if ('output_file' in entry) : filename_out = entry['output_file']
+            else : filename_out = os.path.splitext(filename_in)[0] + '.a'
+            jobs.append({
+                'input_file' : filename_in,
+                'output_file' : filename_out,
+                'address' : my_address,
+                'offset' : job_offset,
+                'limit' : job_limit
+            })
+
+    return jobs
+
+
+
+def _parse_hex(
+    value
+) :
+    # manifest values are hex strings like on the command line, plain json numbers are taken as they are
+    if (isinstance(value, int)) : return value
+    return int(value, 16)
+
+
+
+# label database of a batch worker process, loaded once by _batch_init
+_batch_label_db = None
+
+def _batch_init(
+    filename_labels
+) :
+    global _batch_label_db
+    _batch_label_db = _read_label_file(filename_labels, False, _no_log)
+    return None
+
+
+
+def _batch_job(
+    job,
+    options
+) :
+    summary = {
+        'input_file' : job['input_file'],
+        'output_file' : job['output_file'],
+        'address' : job['address'],
+        'offset' : job['offset'],
+        'limit' : job['limit'],
+        'instructions' : 0,
+        'labels' : 0,
+        'seconds' : 0.0,
+        'error' : None
+    }
+    time_start = time.perf_counter()
+    options = dict(options)
+    options['offset'] = job['offset']
+    options['limit'] = job['limit']
+    options['label_db'] = _batch_label_db
+    try:
+        result = disassemble_to_file(job['input_file'], job['address'], job['output_file'], options)
+        summary['instructions'] = len(result['disassembly'])
+        summary['labels'] = len(result['labels'])
+    except DissectorError as err:
+        summary['error'] = str(err)
+    summary['seconds'] = time.perf_counter()-time_start
+    return summary
+
+
+
+def batch(
+    jobs,
+    options = None,
+    max_workers = None,
+    log = None
+) :
+    """Disassemble many files in worker processes and return one summary dict per job.
+
+    Each job is a dict with input_file, output_file, address, offset and
+    limit. options are passed to disassemble() and must not contain log
+    or label_db, the label database is loaded once per worker process.
+    """
+    if (options is None) : options = {}
+    if (log is None) : log = _no_log
+    filename_labels = options.get('label_file', DEFAULT_OPTIONS['label_file'])
+
+    # compile the label cache once here, so the workers only load it
+    _read_label_file(filename_labels, options.get('rebuild_label_cache', False), log)
+    options = dict(options)
+    options['rebuild_label_cache'] = False
+
+    import concurrent.futures
+    summaries = []
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_batch_init,
+        initargs=(filename_labels,)
+    ) as executor :
+        for summary in executor.map(_batch_job, jobs, [options]*len(jobs)) :
+            if (summary['error'] is None) :
+                log('    %s -> %s: %d instructions, %d labels, %.3fs' % (
+                    summary['input_file'],
+                    summary['output_file'],
+                    summary['instructions'],
+                    summary['labels'],
+                    summary['seconds']
+                ))
+            else : log('    %s: %s' % (summary['input_file'], summary['error']))
+            summaries.append(summary)
+
+    return summaries
+
+
+
+def _do_batch(
+    parser,
+    args
+) :
+    options = _options_from_args(parser, args, BATCH_UNSUPPORTED_ARGUMENTS)
+    options['jobs'] = 1     #--jobs is the number of worker processes here
+
+    try:
+        jobs = _read_batch_manifest(args.batch, options['offset'], options['limit'])
+        summaries = batch(
+            jobs,
+            options,
+            args.jobs,
+            print
+        )
+    except DissectorError as err:
+        print(err)
+        sys.exit(1)
+
+    failed = 0
+    for summary in summaries :
+        if (summary['error'] is not None) : failed += 1
+    print ("    %d files disassembled, %d failed." % (len(summaries)-failed, failed))
+
+    if (args.summary is not None) :
+        try:
+            with open(args.summary, 'w') as file_summary :
+                json.dump(summaries, file_summary, indent=2)
+        except IOError as err:
+            print("I/O error: {0}".format(err))
+            sys.exit(1)
+
+    if (failed > 0) : sys.exit(1)
+    print ("done.")
+    return None
+
+
+
+def _map_file(
+    filename_in,
+    log = print
+) :
+    # the whole file as zero-copy memoryview
+    log ("    Opening file \"%s\" for reading..." % filename_in)
+    try:
+        with open(filename_in , "rb") as file_in :
+            if (os.fstat(file_in.fileno()).st_size == 0) : return memoryview(b'')
+            mapped = mmap.mmap(file_in.fileno(), 0, access=mmap.ACCESS_READ)
+    except (IOError, ValueError) as err:
+        raise DissectorError("I/O error: {0}".format(err))
+    return memoryview(mapped)
+
+
+
+def _petscii_name(
+    name
+) :
+    # PETSCII filename as printable string, without the padding
+    return bytes(name).translate(DUMP_CHARS['petscii']).decode('ascii').strip()
+
+
+
+def _read_prg(
+    view,
+    filename_in
+) :
+    if (len(view) < 2) : raise DissectorError('error: "%s" is too short for a PRG file' % filename_in)
+    return [{
+        'name' : os.path.splitext(os.path.basename(filename_in))[0],
+        'address' : view[0] | (view[1] << 8),
+        'bank' : None,
+        'data' : view[2:]
+    }]
+
+
+
+def _d64_sector_offsets(
+    tracks
+) :
+    # file offset of the first sector of every track, and sectors per track
+    offsets = [None]
+    sectors = [0]
+    pos = 0
+    for track in range(1, tracks+1) :
+        if (track <= 17) : count = 21
+        elif (track <= 24) : count = 19
+        elif (track <= 30) : count = 18
+        else : count = 17
+        offsets.append(pos)
+        sectors.append(count)
+        pos += count*256
+    return offsets, sectors
+
+
+
+def _d64_blocks(
+    view,
+    track,
+    sector,
+    offsets,
+    sectors
+) :
+    # the sectors of a chain, the first two bytes link to the next one
+    seen = set()
+    while (track != 0) :
+        if (
+            (track >= len(offsets)) or
+            (sector >= sectors[track]) or
+            ((track, sector) in seen)
+        ) :
+            raise DissectorError('error: broken sector chain at track %d, sector %d' % (track, sector))
+        seen.add((track, sector))
+        pos = offsets[track]+sector*256
+        block = view[pos:pos+256]
+        yield block
+        track, sector = block[0], block[1]
+
+
+
+def _d64_file(
+    view,
+    track,
+    sector,
+    offsets,
+    sectors
+) :
+    # the data of a file, in its last sector the link gives the number of the last used byte
+    parts = []
+    for block in _d64_blocks(view, track, sector, offsets, sectors) :
+        if (block[0] == 0) : parts.append(block[2:max(block[1]+1, 2)])
+        else : parts.append(block[2:])
+    return b''.join(parts)
+
+
+
+def _read_d64(
+    view,
+    filename_in
+) :
+    if (len(view) < D64_SIZE) : raise DissectorError('error: "%s" is too short for a D64 image' % filename_in)
+    if (len(view) >= D64_SIZE_40) : tracks = 40
+    else : tracks = 35
+    offsets, sectors = _d64_sector_offsets(tracks)
+
+    bam = offsets[18]
+    entries = []
+    for block in _d64_blocks(view, view[bam], view[bam+1], offsets, sectors) :
+        for pos in range(0, 256, 32) :  #8 directory entries per sector
+            if ((block[pos+2] & 0x87) != 0x82) : continue    #closed PRG files only
+            data = _d64_file(view, block[pos+3], block[pos+4], offsets, sectors)
+            if (len(data) < 2) : continue
+            entries.append({
+                'name' : _petscii_name(block[pos+5:pos+21]),
+                'address' : data[0] | (data[1] << 8),
+                'bank' : None,
+                'data' : memoryview(data)[2:]
+            })
+    return entries
+
+
+
+def _read_t64(
+    view,
+    filename_in
+) :
+    if (
+        (len(view) < 0x40) or
+        (bytes(view[0:3]) != T64_SIGNATURE)
+    ) :
+        raise DissectorError('error: "%s" is no T64 image' % filename_in)
+
+    max_entries = view[0x22] | (view[0x23] << 8)
+    records = []
+    for pos in range(0x40, min(0x40+max_entries*32, len(view)-31), 32) :
+        if (view[pos] == 0) : continue  #free entry
+        start, end, offset = struct.unpack_from('<HH2xI', view, pos+2)
+        records.append((offset, start, end, view[pos+0x10:pos+0x20]))
+
+    # the end address is wrong in many images, the next file limits the length
+    records.sort(key=lambda record : record[0])
+    entries = []
+    for index, (offset, start, end, name) in enumerate(records) :
+        if (offset >= len(view)) : continue
+        length = len(view)-offset
+        if (index+1 < len(records)) : length = min(length, records[index+1][0]-offset)
+        if (end > start) : length = min(length, end-start)
+        entries.append({
+            'name' : _petscii_name(name),
+            'address' : start,
+            'bank' : None,
+            'data' : view[offset:offset+length]
+        })
+    return entries
+
+
+
+def _read_crt(
+    view,
+    filename_in
+) :
+    if (
+        (len(view) < 0x40) or
+        (bytes(view[0:16]) != CRT_SIGNATURE)
+    ) :
+        raise DissectorError('error: "%s" is no CRT image' % filename_in)
+
+    pos = struct.unpack_from('>I', view, 0x10)[0]
+    entries = []
+    while (pos+0x10 <= len(view)) :
+        signature, length, _, bank, address, size = struct.unpack_from('>4sIHHHH', view, pos)
+        if ((signature != b'CHIP') or (length < 0x10)) :
+            raise DissectorError('error: "%s" has no CHIP packet at $%x' % (filename_in, pos))
+        entries.append({
+            'name' : 'bank%02d_%04x' % (bank, address),
+            'address' : address,
+            'bank' : bank,
+            'data' : view[pos+0x10:pos+0x10+size]
+        })
+        pos += length
+    return entries
+
+
+
+CONTAINER_READERS = {   #by filename extension
+    '.prg' : _read_prg,
+    '.d64' : _read_d64,
+    '.t64' : _read_t64,
+    '.crt' : _read_crt
+}
+
+
+
+def read_container(
+    filename_in,
+    log = None
+) :
+    """Read a PRG file, D64, T64 or CRT image and return its files.
+
+    Every file is a dict with name, address (load address), bank (CRT
+    only, else None) and data (memoryview without the load address).
+    """
+    if (log is None) : log = _no_log
+    reader = CONTAINER_READERS.get(os.path.splitext(filename_in)[1].lower())
+    if (reader is None) : raise DissectorError('error: "%s" is no PRG, D64, T64 or CRT file' % filename_in)
+    return reader(_map_file(filename_in, log), filename_in)
+
+
+
+def _container_output_files(
+    entries,
+    filename_out
+) :
+    # one output file per entry: the given name for a single entry,
+    # else its base name with the entry name appended, "-" writes all to stdout
+    if (
+        (len(entries) == 1) or
+        (filename_out == '-')
+    ) :
+        return [filename_out]*len(entries)
+    base, extension = os.path.splitext(filename_out)
+    filenames_out = []
+    for entry in entries :
+        name = ''.join(char if (char.isalnum() or char in '-.') else '_' for char in entry['name'])
+        filename = '%s_%s%s' % (base, name.lower(), extension)
+        count = 1
+        while (filename in filenames_out) :
+            count += 1
+            filename = '%s_%s_%d%s' % (base, name.lower(), count, extension)
+        filenames_out.append(filename)
+    return filenames_out
+
+
+
+def container(
+    filename_in,
+    filename_out,
+    options = None,
+    log = None
+) :
+    """Disassemble every file of a PRG, D64, T64 or CRT image in this process.
+
+    Each file is written to filename_out, or to filename_out with the
+    file name appended if the image holds several files. The label
+    database is loaded once for all files. Returns one summary dict per
+    file like batch().
+    """
+    if (options is None) : options = {}
+    if (log is None) : log = _no_log
+    entries = read_container(filename_in, log)
+    if (len(entries) == 0) : raise DissectorError('error: "%s" holds no files' % filename_in)
+
+    options = dict(options)
+    my_offset = options.get('offset', 0)
+    my_limit = options.get('limit', 0)
+    if (options.get('label_db') is None) :
+        options['label_db'] = _read_label_file(
+            options.get('label_file', DEFAULT_OPTIONS['label_file']),
+            options.get('rebuild_label_cache', False),
+            log
+        )
+
+    summaries = []
+    for entry, entry_out in zip(entries, _container_output_files(entries, filename_out)) :
+        summary = {
+            'input_file' : '%s:%s' % (filename_in, entry['name']),
+            'output_file' : entry_out,
+            'address' : entry['address']+my_offset,
+            'bank' : entry['bank'],
+            'offset' : my_offset,
+            'limit' : my_limit,
+            'instructions' : 0,
+            'labels' : 0,
+            'seconds' : 0.0,
+            'error' : None
+        }
+        time_start = time.perf_counter()
+        options['filename'] = summary['input_file']
+        try:
+            result = disassemble_to_file(entry['data'], summary['address'], entry_out, options)
+            summary['instructions'] = len(result['disassembly'])
+            summary['labels'] = len(result['labels'])
+        except DissectorError as err:
+            summary['error'] = str(err)
+        summary['seconds'] = time.perf_counter()-time_start
+
+        if (summary['error'] is None) :
+            log('    %s -> %s: $%04x, %d instructions, %d labels, %.3fs' % (
+                summary['input_file'],
+                summary['output_file'],
+                summary['address'],
+                summary['instructions'],
+                summary['labels'],
+                summary['seconds']
+            ))
+        else : log('    %s: %s' % (summary['input_file'], summary['error']))
+        summaries.append(summary)
+
+    return summaries
+
+
+
+def _do_container(
+    parser,
+    args
+) :
+    options = _options_from_args(parser, args, CONTAINER_UNSUPPORTED_ARGUMENTS)
+
+    # when the disassembly goes to stdout, all messages go to stderr
+    if (args.output_file == '-') : log = _log_stderr
+    else : log = print
+
+    filename_out = args.output_file
+    if (filename_out is None) : filename_out = os.path.splitext(args.input_file)[0] + '.a'
+
+    try:
+        summaries = container(
+            args.input_file,
+            filename_out,
+            options,
+            log
+        )
+    except DissectorError as err:
+        log(err)
+        sys.exit(1)
+
+    failed = 0
+    for summary in summaries :
+        if (summary['error'] is not None) : failed += 1
+    log ("    %d files disassembled, %d failed." % (len(summaries)-failed, failed))
+
+    if (args.summary is not None) :
+        try:
+            with open(args.summary, 'w') as file_summary :
+                json.dump(summaries, file_summary, indent=2)
+        except IOError as err:
+            log("I/O error: {0}".format(err))
+            sys.exit(1)
+
+    if (failed > 0) : sys.exit(1)
+    log ("done.")
+    return None
+
+
+
+def serve(
+    address,
+    filename_labels,
+    log = None
+) :
+    """Serve disassembly requests on a unix socket path or "host:port" until interrupted.
+
+    Requests may read any file the server can read, so TCP is only
+    served on loopback hosts like localhost or 127.0.0.1.
+
+    Every request is one line of json, for example
+        {"id": 1, "path": "test.prg", "address": "0801", "options": {"offset": 2}}
+    with "data" (base64) instead of "path" for binaries sent along, and
+    "format" one of "source" (default), "instructions" or "both".
+    Every response is one line of json with "id", "ok" and the results or "error".
+    """
+    import asyncio  #only the server needs it, imported here to keep the start of every other run fast
+
+    if (log is None) : log = _no_log
+    host, port = _serve_address(address)
+    label_db = _read_label_file(filename_labels, False, log)
+    try:
+        asyncio.run(_serve(address, host, port, label_db, log))
+    except KeyboardInterrupt :
+        pass
+    return None
+
+
+
+def _serve_address(
+    address
+) :
+    # (host, port) of a TCP address, (None, address) of a unix socket path.
+    # "host:port" is TCP if port is a number and host holds no path separator
+    import socket
+    import ipaddress
+    import stat
+
+    host, _, port = address.rpartition(':')
+    if (
+        (host != '') and
+        port.isdigit() and
+        (os.sep not in host)
+    ) :
+        if (host.startswith('[') and host.endswith(']')) : host = host[1:-1]   #[::1]:6502
+        try:
+            infos = socket.getaddrinfo(host, int(port), type=socket.SOCK_STREAM)
+        except socket.gaierror as err:
+            raise DissectorError('error: host "%s": %s' % (host, err))
+        for info in infos :
+            if (not ipaddress.ip_address(info[4][0].split('%')[0]).is_loopback) :
+                raise DissectorError('error: --serve only listens on loopback hosts, not on "%s"' % host)
+        return (host, int(port))
+
+    try:
+        mode = os.lstat(address).st_mode
+    except FileNotFoundError :
+        return (None, address)
+    if (not stat.S_ISSOCK(mode)) : raise DissectorError('error: "%s" exists and is not a socket' % address)
+    return (None, address)
+
+
+
+async def _serve(
+    address,
+    host,
+    port,
+    label_db,
+    log
+) :
+    import asyncio
+    handler = functools.partial(_serve_client, label_db=label_db, log=log)
+    if (host is not None) :
+        server = await asyncio.start_server(handler, host, port, limit=SERVER_LINE_LIMIT)
+    else :
+        if (os.path.exists(address)) : os.remove(address)   #stale socket of an earlier run, checked by _serve_address
+        server = await asyncio.start_unix_server(handler, address, limit=SERVER_LINE_LIMIT)
+    log('    Serving on %s...' % address)
+    async with server :
+        await server.serve_forever()
+
+
+
+async def _serve_client(
+    reader,
+    writer,
+    label_db,
+    log
+) :
+    # requests of one connection are answered in order, connections run concurrently
+    import asyncio
+    loop = asyncio.get_running_loop()
+    try:
+        while True :
+            try:
+                line = await reader.readline()
+            except ValueError :     #line longer than SERVER_LINE_LIMIT
+                response = {'id' : None, 'ok' : False, 'error' : 'error: request too long'}
+                writer.write((json.dumps(response)+'\n').encode('utf-8'))
+                break
+            if (not line) : break
+            response = await loop.run_in_executor(None, _serve_request, line, label_db)
+            writer.write((json.dumps(response)+'\n').encode('utf-8'))
+            await writer.drain()
+    except ConnectionError :
+        pass
+    finally:
+        writer.close()
+    return None
+
+
+
+def _serve_request(
+    line,
+    label_db
+) :
+    request_id = None
+    try:
+        request = json.loads(line)
+        if (not isinstance(request, dict)) : raise DissectorError('error: request has to be a json object')
+        request_id = request.get('id')
+
+        import base64
+        if ('data' in request) : data = base64.b64decode(request['data'], validate=True)
+        elif ('path' in request) : data = request['path']
+        else : raise DissectorError('error: request needs "data" or "path"')
+
+        options = {}
+        for key, value in request.get('options', {}).items() :
+            if (key not in SERVER_OPTIONS) : raise DissectorError("error: option \"%s\" not allowed" % key)
+            options[key] = value
+        for key in ('offset', 'limit') :
+            if (key in options) : options[key] = _parse_hex(options[key])
+        if ('entries' in options) : options['entries'] = [_parse_hex(entry) for entry in options['entries']]
+        if ('trace' in options) :
+            # the program is traced from its start and from every entry point
+            if (not isinstance(options['trace'], int)) : raise DissectorError('error: option "trace" has to be a number of cycles')
+            if (options['trace']*(len(options.get('entries', ()))+1) > SERVER_TRACE_LIMIT) :
+                raise DissectorError('error: trace exceeds the limit of %d cycles per request' % SERVER_TRACE_LIMIT)
+        options['label_db'] = label_db
+
+        output_format = request.get('format', 'source')
+        if (output_format not in ('source', 'instructions', 'both')) :
+            raise DissectorError("error: unknown format \"%s\"" % output_format)
+
+        result = disassemble(data, _parse_hex(request['address']), options)
+    except DissectorError as err:
+        return {'id' : request_id, 'ok' : False, 'error' : str(err)}
+    except (KeyError, TypeError, ValueError, AttributeError) as err:
+        return {'id' : request_id, 'ok' : False, 'error' : 'error: bad request {0}'.format(err)}
+
+    response = {'id' : request_id, 'ok' : True}
+    if (output_format != 'instructions') : response['source'] = result['source']
+    if (output_format != 'source') :
+        response['instructions'] = list(_instruction_records(result['disassembly'], result['label_index']))
+        response['labels'] = result['labels']
+    return response
+
+
+
+def _print_stats(
+    stats
+) :
+    # statistics always go to stderr, they are not part of the output
+    header = '    stage                          time'
+    if (any('peak_memory' in stage for stage in stats['stages'].values())) : header += '       peak memory'
+    _log_stderr(header)
+    total = 0.0
+    for name, stage in stats['stages'].items() :
+        total += stage['seconds']
+        if ('peak_memory' in stage) : _log_stderr('    %-24s %9.3f ms %12d bytes' % (name, stage['seconds']*1000, stage['peak_memory']))
+        else : _log_stderr('    %-24s %9.3f ms' % (name, stage['seconds']*1000))
+    _log_stderr('    %-24s %9.3f ms' % ('total', total*1000))
+    for name, value in stats['counters'].items() :
+        _log_stderr('    %-24s %12s' % (name, value))
+    return None
+
+
+
+def _log_stderr(
+    message
+) :
+    print(message, file=sys.stderr)
+    return None
+
+
+
+def _main_procedure() :
+    # output piped into a program that exits early (like head) ends the run
+    # quietly, https://docs.python.org/3/library/signal.html#note-on-sigpipe
+    try:
+        _main_arguments()
+        sys.stdout.flush()
+    except BrokenPipeError :
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())   #python flushes stdout again at exit
+        sys.exit(1)
+    return None
+
+
+
+def _main_arguments() :
+
+    #https://docs.python.org/3/library/argparse.html
+    parser = argparse.ArgumentParser(
+        description='This program disassembles 6502 code.',
+        epilog='Example: ./dissector.py test.prg test.a 2000 -lf c64labels.json -o 2 -l 100 -t acme --dump --labels --illegals --cycles'
+    )
+    parser.add_argument('input_file', nargs='?', help='binary input file, "-" reads from stdin')
+    parser.add_argument('output_file', nargs='?', help='sourcecode output file, "-" writes to stdout')
+    parser.add_argument('startaddress', nargs='?', help='startaddress in hex, read from the file for .prg, .d64, .t64 and .crt if missing')
+    parser.add_argument('-lf', '--label-file', dest='label_file', help='labels json-file, default=\"c64labels.json\"', default='c64labels.json')
+    parser.add_argument('-o', '--offset', dest='offset', help='offset in hex', default='0')
+    parser.add_argument('-l', '--limit', dest='limit', help='limit in hex', default='0')
+    parser.add_argument('-t', '--asmtype', dest='asmtype', help='assembler-type', choices=sorted(ASSEMBLERS), default='acme', required=False)
+    parser.add_argument('-d', '--dump', dest='memorydump', help='show memory-dump',  action='store_true')
+    parser.add_argument('--dump-chars', dest='dumpchars', help='show the memory-dump as characters, too', choices=['petscii','screen'], default=None)
+    parser.add_argument('-i', '--illegals', dest='illegals', help='use illegal opcodes', action='store_true')
+    parser.add_argument('-ll', '--labels', dest='labellist', help='show label-list', action='store_true')
+    parser.add_argument('-cc', '--cycles', dest='cycles', help='show cycles', action='store_true')
+    parser.add_argument('-x', '--xref', dest='xref', help='show cross-references', action='store_true')
+    parser.add_argument('-f', '--flow', dest='flow', help='follow the program flow, unreached bytes are data', action='store_true')
+    parser.add_argument('-e', '--entry', dest='entries', help='additional entry point in hex for --flow, can be repeated', action='append', default=[])
+    parser.add_argument('--trace', dest='trace', help='run the program for this many cycles (decimal) and follow the executed code like --flow', type=int, default=0)
+    parser.add_argument('--jsonl', dest='jsonl_file', help='also write the instructions as json lines to this file, "-" writes to stdout')
+    parser.add_argument('--columns', dest='columns_file', help='also write the instruction table as binary columns to this file')
+    parser.add_argument('--rebuild-label-cache', dest='rebuild_label_cache', help='recompile the cached labels json-file', action='store_true')
+    parser.add_argument('-s', '--session', dest='session', help='session file, only stages whose input changed are run again')
+    parser.add_argument('--no-cache', dest='no_cache', help='do not use or update the result cache', action='store_true')
+    parser.add_argument('--cache-size', dest='cache_size', help='megabytes kept in the result cache, default=%d' % (DEFAULT_OPTIONS['cache_size'] // 0x100000), type=int, default=DEFAULT_OPTIONS['cache_size'] // 0x100000)
+    parser.add_argument('--stats', dest='stats', help='show the time of every stage and counters on stderr', action='store_true')
+    parser.add_argument('--stats-memory', dest='stats_memory', help='like --stats, but also trace the peak memory of every stage, which slows them down', action='store_true')
+    parser.add_argument('--stats-json', dest='stats_json', help='write the statistics to this json-file')
+    parser.add_argument('--profile', dest='profile', help='write cProfile data of the whole run to this file')
+    parser.add_argument('--serve', dest='serve', help='serve json requests on this unix socket path or loopback host:port')
+    parser.add_argument('-b', '--batch', dest='batch', help='disassemble all files listed in this manifest json-file')
+    parser.add_argument('-j', '--jobs', dest='jobs', help='number of worker processes in batch mode (default=number of cpus) or for decoding and labelling one large image (default=1)', type=int, default=None)
+    parser.add_argument('--summary', dest='summary', help='write a json summary of the batch or image run to this file')
+    args = parser.parse_args()
+
+    if ('-' in (args.output_file, args.jsonl_file)) : file_messages = sys.stderr
+    else : file_messages = sys.stdout
+    print("%s v%s [%s] *** by fieserWolF"% (PROGNAME, VERSION, DATUM), file=file_messages)
+
+    if (args.batch is not None) :
+        _do_batch(parser, args)
+        return None
+
+    if (args.serve is not None) :
+        try:
+            serve(args.serve, args.label_file, print)
+        except (DissectorError, OSError, ValueError) as err:
+            print(err)
+            sys.exit(1)
+        return None
+
+    if (
+        (args.rebuild_label_cache == True) &
+        (args.input_file is None)
+    ) :
+        try:
+            _read_label_file(args.label_file, True)
+        except DissectorError as err:
+            print(err)
+            sys.exit(1)
+        print ("done.")
+        return None
+
+    # without startaddress, PRG files and disk, tape and cartridge images are read with their load addresses
+    if (
+        (args.input_file is not None) and
+        (args.startaddress is None) and
+        (os.path.splitext(args.input_file)[1].lower() in CONTAINER_READERS)
+    ) :
+        _do_container(parser, args)
+        return None
+
+    if (
+        (args.input_file is None) |
+        (args.output_file is None) |
+        (args.startaddress is None)
+    ) :
+        parser.error('the following arguments are required: input_file, output_file, startaddress')
+
+    _do_it(parser, args)
+
+
+if __name__ == '__main__':
+    _main_procedure()
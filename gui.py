@@ -1,9 +1,40 @@
 #!/usr/bin/env -S python3 -B
 
-import sys
+import threading
 import PySimpleGUI as sg
 import dissector as dis
 
+
+
+def _dissect(
+    window,
+    cancel,
+    input_file,
+    output_file,
+    address,
+    options
+) :
+    # runs in a background thread, talks to the window only through events
+    def progress(stage) :
+        if (cancel.is_set()) : raise dis.DissectorCancelled('Cancelled.')
+        window.write_event_value('-progress-', stage)
+
+    options['progress'] = progress
+    options['cancel'] = cancel
+    try:
+        dis.disassemble_to_file(input_file, address, output_file, options)
+    except dis.DissectorError as err:
+        window.write_event_value('-failed-', str(err))
+        return None
+    except Exception as err:    #any other error must not leave the window waiting for the worker
+        window.write_event_value('-failed-', 'error: {0}'.format(err))
+        return None
+
+    window.write_event_value('-done-', None)
+    return None
+
+
+
 if __name__ == '__main__':
     sg.theme('SystemDefaultForReal')
     layout = [
@@ -21,55 +52,72 @@ if __name__ == '__main__':
         [sg.Checkbox('Show memory dump  ', default=False, key="-dump-"), sg.Checkbox('Use illegal Opcodes', default=False, key="-illegals-")],
         [sg.Checkbox('Show label list           ', default=False, key="-labellist-"), sg.Checkbox('Show cycles', default=False, key="-cycles-")],
         [sg.T("")],
-        [sg.Button("Dissect!")]
+        [sg.Button("Dissect!"), sg.Button("Cancel", disabled=True), sg.T("", key="-status-", size=(40, 1))]
     ]
 
     window = sg.Window('Dissector V1.00', layout, size=(510, 440))
+    cancel = threading.Event()
+    worker = None
 
     while True:
         event, values = window.read()
         if event == sg.WIN_CLOSED or event == "Exit":
+            cancel.set()
             break
         elif event == "Dissect!":
             input_file = values["infile"]
             output_file = values["outfile"]
             startaddress = values["startaddy"]
 
-            #clear up
-            sys.argv = [sys.argv[0]]
-
-            sys.argv.extend([input_file, output_file, startaddress])
-        
             if (input_file == '') or (output_file == '') or (startaddress == ''):
                 sg.popup('Inputfile, Outputfile or Startaddress cant be empty!')
                 continue
 
+            options = {}
+            try:
+                address = int(startaddress, 16)
+                if values["-offset-"] != '':
+                    options['offset'] = int(values["-offset-"], 16)
+                if values["-limit-"] != '':
+                    options['limit'] = int(values["-limit-"], 16)
+            except ValueError:
+                sg.popup('Startaddress, Offset and Limit have to be hex numbers!')
+                continue
+
             if values["labs"] != '':
-                sys.argv.extend(['-lf'])
-                sys.argv.extend([values["labs"]])
-            if values["-offset-"] != '':
-                sys.argv.extend(['-o'])
-                sys.argv.extend([values["-offset-"]])
-            if values["-limit-"] != '':
-                sys.argv.extend(['-l'])
-                sys.argv.extend([values["-limit-"]])
+                options['label_file'] = values["labs"]
             if values["-acme-"] == True:
-                sys.argv.extend(['-t'])
-                sys.argv.extend(['acme'])
+                options['asmtype'] = 'acme'
             else:
-                sys.argv.extend(['-t'])
-                sys.argv.extend(['kickass'])
-            if values["-dump-"] == True:
-                sys.argv.extend(['-d'])
-            if values["-illegals-"] == True:
-                sys.argv.extend(['-i'])
-            if values["-labellist-"] == True:
-                sys.argv.extend(['-ll'])
-            if values["-cycles-"] == True:
-                sys.argv.extend(['-cc'])
-
-            #sg.popup(sys.argv)
-            dis._main_procedure()
-
-
-            sg.popup('All done!')
+                options['asmtype'] = 'kickass'
+            options['memorydump'] = values["-dump-"]
+            options['illegals'] = values["-illegals-"]
+            options['labellist'] = values["-labellist-"]
+            options['cycles'] = values["-cycles-"]
+
+            cancel.clear()
+            window["Dissect!"].update(disabled=True)
+            window["Cancel"].update(disabled=False)
+            window["-status-"].update('Starting...')
+            worker = threading.Thread(
+                target=_dissect,
+                args=(window, cancel, input_file, output_file, address, options),
+                daemon=True
+            )
+            worker.start()
+        elif event == "Cancel":
+            cancel.set()
+            window["-status-"].update('Cancelling...')
+        elif event == '-progress-':
+            window["-status-"].update(values['-progress-'].replace('_', ' '))
+        elif event in ('-done-', '-failed-'):
+            worker = None
+            window["Dissect!"].update(disabled=False)
+            window["Cancel"].update(disabled=True)
+            window["-status-"].update('')
+            if event == '-done-':
+                sg.popup('All done!')
+            else:
+                sg.popup(values['-failed-'])
+
+    window.close()